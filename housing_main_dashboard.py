@@ -1,20 +1,113 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from source.bubble_detection import BubbleDetector
 from source.market_predictor import HousingMarketPredictor
+from source.utils.timeseries_downsampler import TimeSeriesDownsampler
 
 st.set_page_config(page_title="🏠 Housing Market Dashboard", layout="wide")
 
-st.title("📊 Housing Market Trends & Bubble Detection")
+downsampler = TimeSeriesDownsampler()
+
+
+def viewport_for(chart_key):
+    """Return the zoomed date range for a chart, or None when showing the full history."""
+    return st.session_state.get(f"{chart_key}_viewport")
+
+
+def plot_downsampled_chart(fig, stats, chart_key):
+    """
+    Render a downsampled chart. Box-selecting a date range zooms in and refetches
+    that range at full viewport resolution on the next rerun.
+    """
+    event = st.plotly_chart(fig, use_container_width=True, key=chart_key,
+                            on_select="rerun", selection_mode="box")
+    boxes = event.selection.box if event and event.selection else []
+    if boxes:
+        x0, x1 = sorted(pd.to_datetime(boxes[0]['x']))
+        if viewport_for(chart_key) != (x0, x1):
+            st.session_state[f"{chart_key}_viewport"] = (x0, x1)
+            st.rerun()
+
+    st.caption(downsampler.format_stats(stats) + " · box-select to zoom")
+    if viewport_for(chart_key) is not None and st.button("↩️ Reset zoom", key=f"{chart_key}_reset"):
+        st.session_state.pop(f"{chart_key}_viewport")
+        st.rerun()
+
+FORECAST_VIEW = "📈 Market Forecasting"
+BUBBLE_VIEW = "💥 Bubble Detection"
+
+
+def compute_forecast_view():
+    """Walk-forward training for the forecasting view."""
+    predictor = HousingMarketPredictor()
+    metrics = predictor.train_models()
+    return predictor, metrics
+
+
+def compute_bubble_view():
+    """Bulk bubble scoring for the bubble detection view."""
+    detector = BubbleDetector()
+    return detector, detector.calculate_enhanced_bubble_scores()
+
+
+VIEW_LOADERS = {
+    FORECAST_VIEW: compute_forecast_view,
+    BUBBLE_VIEW: compute_bubble_view,
+}
+
+
+@st.cache_resource(ttl=3600)
+def view_jobs():
+    """
+    Process-wide view computations, shared by every session.
+    Each view is computed at most once per hour; a job already running
+    (e.g. a background prefetch) is awaited rather than started again.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(VIEW_LOADERS), thread_name_prefix="view-loader")
+    return {'executor': executor, 'futures': {}, 'lock': threading.Lock()}
 
-# Tabs for clean separation
-tabs = st.tabs(["📈 Market Forecasting", "💥 Bubble Detection"])
+
+def submit_view(view):
+    jobs = view_jobs()
+    with jobs['lock']:
+        if view not in jobs['futures']:
+            jobs['futures'][view] = jobs['executor'].submit(VIEW_LOADERS[view])
+        return jobs['futures'][view]
+
+
+def load_view(view):
+    """Return the selected view's data, computing it only if it is not cached or in flight."""
+    future = submit_view(view)
+    try:
+        return future.result()
+    except Exception:
+        # Drop the failed job so the next rerun retries instead of replaying the error
+        with view_jobs()['lock']:
+            view_jobs()['futures'].pop(view, None)
+        raise
+
+
+def prefetch_other_views(current_view):
+    """Warm the views the user is not looking at; called after the current view has painted."""
+    for view in VIEW_LOADERS:
+        if view != current_view:
+            submit_view(view)
+
+
+@st.cache_data(ttl=3600)
+def load_predictions(_predictor, model_name):
+    return _predictor.get_predictions_df(model_name)
+
+
+st.title("📊 Housing Market Trends & Bubble Detection")
 
 # ---------------------------
-# TAB 1: MARKET FORECASTING
+# VIEW 1: MARKET FORECASTING
 # ---------------------------
-with tabs[0]:
+@st.fragment
+def forecast_view():
     st.subheader("🏷️ Model Performance & Forecast")
 
     st.markdown("""
@@ -30,21 +123,25 @@ with tabs[0]:
     Use the dropdown menu to switch between models and explore how well they align with actual prices over time.
     """)
 
-    predictor = HousingMarketPredictor()
-    metrics = predictor.train_models()
+    with st.spinner("Training forecasting models..."):
+        predictor, metrics = load_view(FORECAST_VIEW)
     model_choice = st.selectbox("Choose a model to visualize", list(metrics.keys()))
-    pred_df = predictor.get_predictions_df(model_choice)
+    pred_df = load_predictions(predictor, model_choice).copy()
 
     pred_df['date_key'] = pd.to_datetime(pred_df['date_key'])
 
-    fig = px.line(pred_df, x='date_key', y=['actual_price', 'predicted_price'],
-              labels={'value': 'Price Index', 'date_key': 'Date', 'variable': 'Legend'},
-              title=f"{model_choice.title()} Predictions vs Actual")
+    fig, fig_stats = downsampler.build_line_figure(
+        pred_df, x='date_key', y_cols=['actual_price', 'predicted_price'],
+        labels={'value': 'Price Index', 'date_key': 'Date', 'variable': 'Legend'},
+        title=f"{model_choice.title()} Predictions vs Actual",
+        x_range=viewport_for("forecast_chart"),
+        band=('predicted_lower', 'predicted_upper',
+              f"Prediction interval ({metrics[model_choice]['Interval_Coverage']:.0%} walk-forward coverage)"))
 
     # fig = px.line(pred_df, x='date_key', y=['actual_price', 'predicted_price'],
     #               labels={'value': 'Home Price Index', 'date_key': 'Date'},
     #               title=f"📉 {model_choice.title()} Predictions vs Actual")
-    st.plotly_chart(fig, use_container_width=True)
+    plot_downsampled_chart(fig, fig_stats, "forecast_chart")
 
     st.metric("RMSE", f"{metrics[model_choice]['RMSE']:.2f}")
     st.metric("Adjusted R²", f"{metrics[model_choice]['Adjusted_R2']:.3f}")
@@ -84,9 +181,10 @@ with tabs[0]:
         """)
 
 # ---------------------------
-# TAB 2: BUBBLE DETECTION
+# VIEW 2: BUBBLE DETECTION
 # ---------------------------
-with tabs[1]:
+@st.fragment
+def bubble_view():
     st.subheader("💥 Housing Bubble Risk Monitor")
 
     st.markdown("""
@@ -121,8 +219,8 @@ with tabs[1]:
     You can also generate a **new score for the most recent data** using the "Get Latest Score" button below.
     """)
 
-    detector = BubbleDetector()
-    df_scores = detector.calculate_enhanced_bubble_scores()
+    with st.spinner("Scoring bubble risk..."):
+        detector, df_scores = load_view(BUBBLE_VIEW)
 
     # fig2 = px.line(df_scores, x='date_key', y='risk_score',
     #                color='risk_level',
@@ -133,9 +231,12 @@ with tabs[1]:
     # fig2.add_hline(y=40, line_dash="dash", line_color="orange", annotation_text="Moderate Risk")
 
     # ✅ Plot a single line (continuous)
-    fig2 = px.line(df_scores, x='date_key', y='risk_score',
-                title="🏠 Bubble Risk Score Over Time",
-                labels={'date_key': 'Date', 'risk_score': 'Risk Score'})
+    fig2, fig2_stats = downsampler.build_line_figure(
+        df_scores, x='date_key', y_cols=['risk_score'],
+        title="🏠 Bubble Risk Score Over Time",
+        labels={'date_key': 'Date', 'value': 'Risk Score'},
+        x_range=viewport_for("risk_chart"))
+    fig2.update_layout(showlegend=True)
 
     # Add background bands for zones
     fig2.add_hline(y=60, line_dash="dash", line_color="red", annotation_text="High Risk")
@@ -156,7 +257,7 @@ with tabs[1]:
         name='Recent Risk Points'
     )
 
-    st.plotly_chart(fig2, use_container_width=True)
+    plot_downsampled_chart(fig2, fig2_stats, "risk_chart")
 
     latest = df_scores.iloc[-1]
     st.metric("Latest Risk Score", f"{latest['risk_score']} ({latest['risk_level']})")
@@ -170,3 +271,15 @@ with tabs[1]:
         detector.store_single_score(new_score)
         st.success(f"✅ New score ({new_score.iloc[0]['risk_score']}) stored as live run.")
         st.write(new_score[['date_key', 'risk_score', 'risk_level', 'notes']])
+
+
+# Only the selected view is computed on each run; widgets inside a view rerun just that fragment
+selected_view = st.segmented_control("View", list(VIEW_LOADERS), default=FORECAST_VIEW,
+                                     label_visibility="collapsed") or FORECAST_VIEW
+
+if selected_view == FORECAST_VIEW:
+    forecast_view()
+else:
+    bubble_view()
+
+prefetch_other_views(selected_view)
@@ -0,0 +1,219 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from source.bubble_detection import BubbleDetector
+
+# The cutoffs and points hardcoded in BubbleDetector.score_indicators
+DEFAULT_RULES = {
+    'growth_cuts': [0.05, 0.10, 0.15, 0.20, 0.25],
+    'growth_points': [5, 10, 20, 25, 30],
+    'accel_cut': [0.03],
+    'accel_points': [5],
+    'z_cuts': [1, 2, 3],
+    'z_points': [5, 15, 25],
+    'momentum_points': [15],
+    'corr_cuts': [0.6, 0.8],
+    'corr_points': [10, 20],
+    'compound_growth': [0.15],
+    'compound_z': [2],
+    'compound_points': [10],
+    'high_cutoff': [60],
+    'medium_cutoff': [40],
+}
+
+# Labeled run-ups: an alert should fire between start and the price peak
+DEFAULT_EPISODES = [
+    {'name': '2000s housing bubble', 'start': '2003-01-01', 'peak': '2006-04-01'},
+    {'name': 'Pandemic housing boom', 'start': '2020-07-01', 'peak': '2022-04-01'},
+]
+
+
+def rule_columns(group):
+    """Flat config column names for one rule group, e.g. growth_cuts -> growth_cuts_1..5."""
+    size = len(DEFAULT_RULES[group])
+    return [group] if size == 1 else [f"{group}_{i}" for i in range(1, size + 1)]
+
+
+class BubbleThresholdCalibrator:
+    """
+    Evaluates many scoring-rule configurations against labeled bubble episodes at once.
+
+    Indicators are computed once. Each configuration is a row of a frame with one column per
+    cutoff / weight (see DEFAULT_RULES), and a chunk of configurations is scored against all
+    quarters as a configs x quarters matrix by broadcasting. max_cells bounds the largest
+    intermediate array (configs x quarters x tiers) and so the memory of one chunk.
+    """
+
+    def __init__(self, episodes=None, alert_level='High', max_cells=20_000_000):
+        if alert_level not in ('High', 'Medium'):
+            raise ValueError(f"Unknown alert_level: {alert_level}")
+        self.episodes = episodes or DEFAULT_EPISODES
+        self.alert_level = alert_level
+        self.max_cells = max_cells
+
+    # 🔹 Configurations
+
+    def default_config(self):
+        return pd.DataFrame([{
+            col: value for group, values in DEFAULT_RULES.items()
+            for col, value in zip(rule_columns(group), values)
+        }])
+
+    def sample_configs(self, n, seed=0):
+        """
+        n random configurations around the defaults; row 0 is the current rule set.
+        Cutoffs in a tier group are scaled together so they stay ordered.
+        """
+        rng = np.random.default_rng(seed)
+        configs = pd.concat([self.default_config()] * n, ignore_index=True)
+
+        def scale(group, low, high):
+            cols = rule_columns(group)
+            configs[cols] = configs[cols].to_numpy() * rng.uniform(low, high, size=(n, 1))
+
+        for group in ('growth_cuts', 'accel_cut', 'z_cuts', 'compound_growth', 'compound_z'):
+            scale(group, 0.5, 1.5)
+        for group in ('growth_points', 'accel_points', 'z_points', 'momentum_points', 'corr_points', 'compound_points'):
+            scale(group, 0.0, 2.0)
+        # Correlation cutoffs must stay inside [0, 1]
+        corr_cols = rule_columns('corr_cuts')
+        configs[corr_cols] = np.sort(rng.uniform(0.3, 0.95, size=(n, 2)), axis=1)
+        configs['high_cutoff'] = rng.uniform(30, 90, n)
+        configs['medium_cutoff'] = configs['high_cutoff'] * rng.uniform(0.4, 0.9, n)
+
+        configs.iloc[0] = self.default_config().iloc[0]
+        return configs
+
+    # 🔹 Scoring
+
+    def indicator_arrays(self, indicators):
+        """Indicator columns as float arrays; NaN compares False, as in score_indicators."""
+        return {
+            'growth': indicators['growth'].to_numpy(dtype='float64'),
+            'accel': indicators['growth_accel'].to_numpy(dtype='float64'),
+            'abs_z': np.abs(indicators['z_score'].to_numpy(dtype='float64')),
+            'momentum': indicators['momentum'].to_numpy(dtype=bool),
+            'abs_corr': np.abs(indicators['price_rate_corr'].to_numpy(dtype='float64')),
+        }
+
+    @staticmethod
+    def _tier_points(values, cuts, points):
+        """Points of the highest cutoff exceeded (the if/elif chains in score_indicators)."""
+        exceeded = values[None, :, None] > cuts[:, None, :]
+        # Cutoffs are ascending, so the number exceeded is the tier index
+        tier = exceeded.sum(axis=2)
+        table = np.concatenate([np.zeros((len(points), 1)), points], axis=1)
+        return np.take_along_axis(table, tier, axis=1)
+
+    def score_matrix(self, arrays, configs):
+        """Risk scores of every configuration (rows) for every quarter (columns)."""
+        def col(group):
+            return configs[rule_columns(group)].to_numpy(dtype='float64')
+
+        growth, abs_z = arrays['growth'][None, :], arrays['abs_z'][None, :]
+        scores = self._tier_points(arrays['growth'], col('growth_cuts'), col('growth_points'))
+        scores += (arrays['accel'][None, :] > col('accel_cut')) * col('accel_points')
+        scores += self._tier_points(arrays['abs_z'], col('z_cuts'), col('z_points'))
+        scores += arrays['momentum'][None, :] * col('momentum_points')
+        scores += self._tier_points(arrays['abs_corr'], col('corr_cuts'), col('corr_points'))
+        compound = (growth > col('compound_growth')) & (abs_z > col('compound_z'))
+        scores += compound * col('compound_points')
+        return scores
+
+    # 🔹 Evaluation
+
+    def _episode_masks(self, dates):
+        windows = []
+        for episode in self.episodes:
+            start, peak = pd.Timestamp(episode['start']), pd.Timestamp(episode['peak'])
+            mask = (dates >= start) & (dates <= peak)
+            if not mask.any():
+                raise ValueError(f"Episode {episode['name']} is outside the scored quarters")
+            windows.append(mask)
+        return np.array(windows)
+
+    def evaluate(self, indicators, configs):
+        """
+        Hit rate, lead time and false-alarm rate for every configuration.
+
+        hit_rate: share of episodes with at least one alert between start and peak.
+        mean_lead_quarters: quarters from the first alert to the peak, over episodes hit.
+        false_alarm_rate: share of quarters outside all episodes that raise an alert.
+        """
+        arrays = self.indicator_arrays(indicators)
+        windows = self._episode_masks(pd.DatetimeIndex(indicators.index))
+        peak_positions = np.array([np.flatnonzero(w)[-1] for w in windows])
+        calm = ~windows.any(axis=0)
+        cutoff_col = 'high_cutoff' if self.alert_level == 'High' else 'medium_cutoff'
+
+        n_quarters = len(indicators)
+        max_tiers = max(len(v) for v in DEFAULT_RULES.values())
+        chunk_size = max(1, self.max_cells // (n_quarters * max_tiers))
+        results = []
+
+        for start in range(0, len(configs), chunk_size):
+            chunk = configs.iloc[start:start + chunk_size]
+            scores = self.score_matrix(arrays, chunk)
+            alerts = scores > chunk[[cutoff_col]].to_numpy(dtype='float64')
+
+            # configs x episodes x quarters
+            in_window = alerts[:, None, :] & windows[None, :, :]
+            hit = in_window.any(axis=2)
+            first_alert = np.argmax(in_window, axis=2)
+            lead = np.where(hit, peak_positions[None, :] - first_alert, 0)
+            n_hit = hit.sum(axis=1)
+
+            results.append(pd.DataFrame({
+                'hit_rate': n_hit / len(self.episodes),
+                'mean_lead_quarters': np.divide(lead.sum(axis=1), n_hit, out=np.full(len(chunk), np.nan),
+                                                where=n_hit > 0),
+                'false_alarm_rate': alerts[:, calm].mean(axis=1) if calm.any() else 0.0,
+                'alert_quarters': alerts.sum(axis=1),
+            }, index=chunk.index))
+
+        return pd.concat([configs, pd.concat(results)], axis=1)
+
+    def rank(self, results, max_false_alarm_rate=0.1):
+        """Configurations that stay under the false-alarm budget, best hit rate and lead first."""
+        eligible = results[results['false_alarm_rate'] <= max_false_alarm_rate]
+        return eligible.sort_values(
+            ['hit_rate', 'mean_lead_quarters', 'false_alarm_rate'], ascending=[False, False, True]
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep bubble scoring thresholds against labeled episodes.")
+    parser.add_argument('--configs', type=int, default=50_000)
+    parser.add_argument('--alert-level', choices=['High', 'Medium'], default='High')
+    parser.add_argument('--max-false-alarm-rate', type=float, default=0.1)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--local', action='store_true', help="use the processed CSVs instead of Snowflake")
+    parser.add_argument('--output', help="write every configuration's results to this CSV")
+    args = parser.parse_args()
+
+    if args.local:
+        from source.utils.duckdb_connector import DuckDBConnector
+        detector = BubbleDetector(execution_mode='sql', connector=DuckDBConnector())
+        indicators = detector.load_indicators()
+    else:
+        detector = BubbleDetector()
+        indicators = detector.calculate_indicators(detector.load_data()).iloc[20:]
+
+    calibrator = BubbleThresholdCalibrator(alert_level=args.alert_level)
+    configs = calibrator.sample_configs(args.configs)
+
+    started = time.perf_counter()
+    results = calibrator.evaluate(indicators, configs)
+    seconds = time.perf_counter() - started
+    print(f"✅ Evaluated {len(configs):,} configurations x {len(indicators)} quarters in {seconds:.2f}s")
+
+    summary_cols = ['hit_rate', 'mean_lead_quarters', 'false_alarm_rate', 'alert_quarters']
+    print("\n📋 Current rules:")
+    print(results.iloc[[0]][summary_cols].to_string(index=False))
+    print(f"\n📈 Top {args.top} configurations (false alarms <= {args.max_false_alarm_rate:.0%}):")
+    print(calibrator.rank(results, args.max_false_alarm_rate).head(args.top).to_string())
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"✅ Results written to {args.output}")
@@ -1,14 +1,38 @@
 import pandas as pd
 import numpy as np
 from source.utils.snowflake_connector import SnowflakeConnector
+from source.utils.obt_snapshot import OBTSnapshotStore
+from source.utils.feature_store import FeatureStore
 from sqlalchemy import text
 
 class BubbleDetector:
-    def __init__(self):
-        self.sf_connector = SnowflakeConnector()
+    # OBT column -> detector column, matching the aliases in load_data
+    OBT_COLUMNS = {
+        'period': 'date_key',
+        'quarterly_avg_home_price_index': 'price_index',
+        'quarterly_avg_mortgage_rate': 'mortgage_rate',
+    }
+    INDICATOR_COLUMNS = ['growth', 'growth_accel', 'z_score', 'momentum', 'price_rate_corr']
+
+    def __init__(self, execution_mode='pandas', connector=None, snapshot_store=None, feature_store=None):
+        """
+        execution_mode='sql' computes the indicators as window functions in the warehouse
+        (or in a local DuckDBConnector passed as connector) instead of in pandas.
+        In pandas mode indicators are read from the shared feature store when they have been
+        materialized for the current OBT snapshot, and data from the snapshot when one exists.
+        """
+        if execution_mode not in ('pandas', 'sql'):
+            raise ValueError(f"Unknown execution_mode: {execution_mode}")
+        self.execution_mode = execution_mode
+        self.sf_connector = connector or SnowflakeConnector()
+        self.snapshot_store = snapshot_store or OBTSnapshotStore()
+        self.feature_store = feature_store or FeatureStore()
 
     def load_data(self):
-        engine = self.sf_connector.get_engine()
+        df = self.snapshot_store.read_frame(self.OBT_COLUMNS, index='date_key')
+        if df is not None:
+            return df
+
         query = """
             SELECT
                 PERIOD AS date_key,
@@ -17,86 +41,204 @@ class BubbleDetector:
             FROM housing_market_quarterly_combined
             ORDER BY PERIOD
         """
-        df = pd.read_sql(query, engine, parse_dates=['date_key'])
+        df = self.sf_connector.fetch_df(query, parse_dates=['date_key'])
         return df.set_index('date_key')
 
-    def calculate_enhanced_bubble_scores(self, input_df=None):
-        df = input_df if input_df is not None else self.load_data()
-        scores = []
+    def data_from_obt(self, obt_df):
+        """Select and rename detector columns from an already-loaded OBT frame."""
+        df = obt_df[list(self.OBT_COLUMNS)].rename(columns=self.OBT_COLUMNS)
+        return df.sort_values('date_key').set_index('date_key')
 
+    def calculate_indicators(self, df):
+        """Per-quarter bubble indicators computed with pandas rolling windows."""
         price = df['price_index']
         rate = df['mortgage_rate']
         growth = price.pct_change(4)
-        growth_accel = growth.diff().rolling(2).mean()
-        z = (price - price.rolling(20).mean()) / price.rolling(20).std()
-        momentum = price.pct_change(1).rolling(3).mean() > 0
-        corr = price.rolling(4).corr(rate)
-
-        for i in range(20, len(df)):
-            score = 0
-            g = growth.iloc[i]
-            zscore = z.iloc[i]
-            m = momentum.iloc[i]
-            c = corr.iloc[i]
-            accel = growth_accel.iloc[i]
-            notes = []
-
-            if g > 0.25:
-                score += 30
-                notes.append("Growth > 25%")
-            elif g > 0.20:
-                score += 25
-                notes.append("Growth > 20%")
-            elif g > 0.15:
-                score += 20
-                notes.append("Growth > 15%")
-            elif g > 0.10:
-                score += 10
-                notes.append("Growth > 10%")
-            elif g > 0.05:
-                score += 5
-                notes.append("Growth > 5%")
-
-            if accel > 0.03:
-                score += 5
-                notes.append("Acceleration > 3%")
-
-            if abs(zscore) > 3:
-                score += 25
-                notes.append("Z > 3")
-            elif abs(zscore) > 2:
-                score += 15
-                notes.append("Z > 2")
-            elif abs(zscore) > 1:
-                score += 5
-                notes.append("Z > 1")
-
-            if m:
-                score += 15
-                notes.append("Momentum Positive")
-
-            if not np.isnan(c):
-                if abs(c) > 0.8:
-                    score += 20
-                    notes.append("Corr > 0.8")
-                elif abs(c) > 0.6:
-                    score += 10
-                    notes.append("Corr > 0.6")
-
-            if g > 0.15 and abs(zscore) > 2:
-                score += 10
-                notes.append("Compound Growth+Deviation")
-
-            scores.append({
-                'date_key': df.index[i],
-                'risk_score': score,
-                'risk_level': 'High' if score > 60 else 'Medium' if score > 40 else 'Low',
-                'notes': "; ".join(notes),
-                'run_type': 'bulk',
-                'calculation_timestamp': pd.Timestamp.now()
-            })
-
-        return pd.DataFrame(scores)
+        return pd.DataFrame({
+            'growth': growth,
+            'growth_accel': growth.diff().rolling(2).mean(),
+            'z_score': (price - price.rolling(20).mean()) / price.rolling(20).std(),
+            'momentum': price.pct_change(1).rolling(3).mean() > 0,
+            'price_rate_corr': price.rolling(4).corr(rate),
+        }, index=df.index)
+
+    def calculate_panel_indicators(self, panel, region_col='region'):
+        """
+        calculate_indicators for many regions at once. Each region must have a contiguous
+        quarterly series. Returns a long frame indexed by date_key with a region column, from
+        each region's 21st quarter on (the rows calculate_enhanced_bubble_scores scores).
+        """
+        price = panel.pivot(index='date_key', columns=region_col, values='price_index')
+        rate = panel.pivot(index='date_key', columns=region_col, values='mortgage_rate')
+
+        # Every region's quarters end to end, so each rolling statistic is one pass over the panel.
+        # Windows reach back at most 19 quarters and only rows 20+ quarters into a region are
+        # kept, so no kept value sees the previous region.
+        p = pd.Series(price.to_numpy().T.ravel())
+        r = pd.Series(rate.to_numpy().T.ravel())
+        growth = p.pct_change(4, fill_method=None)
+        columns = {
+            'growth': growth,
+            'growth_accel': growth.diff().rolling(2).mean(),
+            'z_score': (p - p.rolling(20).mean()) / p.rolling(20).std(),
+            'momentum': p.pct_change(1, fill_method=None).rolling(3).mean() > 0,
+            'price_rate_corr': p.rolling(4).corr(r),
+        }
+
+        # Regions x quarters mask, flattened in the same order
+        observed = price.notna().to_numpy().T
+        keep = observed & (np.cumsum(observed, axis=1) > 20)
+        region_pos, date_pos = np.nonzero(keep)
+        keep = keep.ravel()
+        return pd.DataFrame(
+            {'region': price.columns.to_numpy()[region_pos],
+             **{name: values.to_numpy()[keep] for name, values in columns.items()}},
+            index=pd.Index(price.index.to_numpy()[date_pos], name='date_key'),
+        )
+
+    def calculate_panel_scores(self, panel, region_col='region'):
+        """Bubble scores for every region of a long panel (region, date_key, price_index, mortgage_rate)."""
+        return self.score_indicators(self.calculate_panel_indicators(panel, region_col))
+
+    def load_stored_indicators(self):
+        """Indicators for the current snapshot from the feature store, or None if not materialized."""
+        version = self.snapshot_store.current_version()
+        if version is None:
+            return None
+        df = self.feature_store.read(['date_key'] + self.INDICATOR_COLUMNS, version=version)
+        return df.set_index('date_key') if df is not None else None
+
+    def build_indicator_query(self, table='housing_market_quarterly_combined', partition_by=None):
+        """
+        Same indicators as calculate_indicators, as window-function SQL (Snowflake and DuckDB).
+        Only rows that would be scored (from the 21st quarter of each series) are returned.
+        """
+        partition = "PARTITION BY region " if partition_by else ""
+        region_select = f"{partition_by} AS region," if partition_by else ""
+        region_col = "region," if partition_by else ""
+
+        def over(preceding=None):
+            frame = f" ROWS BETWEEN {preceding} PRECEDING AND CURRENT ROW" if preceding is not None else ""
+            return f"OVER ({partition}ORDER BY date_key{frame})"
+
+        # Rolling windows require a full frame of non-null values, like pandas' default min_periods
+        def full_frame(expr, size):
+            return f"COUNT({expr}) {over(size - 1)} = {size}"
+
+        both = "CASE WHEN price_index IS NOT NULL AND mortgage_rate IS NOT NULL THEN {} END"
+        return f"""
+            WITH base AS (
+                SELECT
+                    {region_select}
+                    PERIOD AS date_key,
+                    QUARTERLY_AVG_HOME_PRICE_INDEX AS price_index,
+                    QUARTERLY_AVG_MORTGAGE_RATE AS mortgage_rate
+                FROM {table}
+            ),
+            step1 AS (
+                SELECT
+                    base.*,
+                    ROW_NUMBER() {over()} AS row_num,
+                    price_index / NULLIF(LAG(price_index, 4) {over()}, 0) - 1 AS growth,
+                    price_index / NULLIF(LAG(price_index, 1) {over()}, 0) - 1 AS qoq_change,
+                    CASE WHEN {full_frame('price_index', 20)}
+                        THEN (price_index - AVG(price_index) {over(19)})
+                             / NULLIF(STDDEV_SAMP(price_index) {over(19)}, 0)
+                    END AS z_score,
+                    COUNT({both.format('1')}) {over(3)} AS pair_n,
+                    SUM({both.format('price_index')}) {over(3)} AS sx,
+                    SUM({both.format('mortgage_rate')}) {over(3)} AS sy,
+                    SUM({both.format('price_index * price_index')}) {over(3)} AS sxx,
+                    SUM({both.format('mortgage_rate * mortgage_rate')}) {over(3)} AS syy,
+                    SUM({both.format('price_index * mortgage_rate')}) {over(3)} AS sxy
+                FROM base
+            ),
+            step2 AS (
+                SELECT
+                    step1.*,
+                    growth - LAG(growth, 1) {over()} AS growth_diff,
+                    COALESCE(CASE WHEN {full_frame('qoq_change', 3)}
+                        THEN AVG(qoq_change) {over(2)} > 0 END, FALSE) AS momentum,
+                    -- CORR has no framed window form in Snowflake, so use the 4-row sums
+                    CASE WHEN pair_n = 4
+                        THEN (4 * sxy - sx * sy) / NULLIF(SQRT((4 * sxx - sx * sx) * (4 * syy - sy * sy)), 0)
+                    END AS price_rate_corr
+                FROM step1
+            ),
+            step3 AS (
+                SELECT
+                    step2.*,
+                    CASE WHEN {full_frame('growth_diff', 2)} THEN AVG(growth_diff) {over(1)} END AS growth_accel
+                FROM step2
+            )
+            SELECT {region_col} date_key, growth, growth_accel, z_score, momentum, price_rate_corr
+            FROM step3
+            WHERE row_num > 20
+            ORDER BY {region_col} date_key
+        """
+
+    def load_indicators(self, partition_by=None):
+        """Compute indicators in the warehouse and fetch only the indicator columns."""
+        query = self.build_indicator_query(partition_by=partition_by)
+        df = self.sf_connector.fetch_df(query, parse_dates=['date_key'])
+        df['momentum'] = df['momentum'].astype(bool)
+        return df.set_index('date_key')
+
+    def score_indicators(self, indicators):
+        """Apply the scoring rules to every row of an indicator frame at once."""
+        g = indicators['growth'].to_numpy(dtype='float64')
+        accel = indicators['growth_accel'].to_numpy(dtype='float64')
+        abs_z = np.abs(indicators['z_score'].to_numpy(dtype='float64'))
+        momentum = indicators['momentum'].to_numpy(dtype=bool)
+        abs_corr = np.abs(indicators['price_rate_corr'].to_numpy(dtype='float64'))
+
+        # Each rule picks a tier per row (the first condition met, as in an if/elif chain; NaN meets none).
+        # Tier 0 adds nothing; tier i adds points[i] and notes[i].
+        rules = [
+            (np.select([g > 0.25, g > 0.20, g > 0.15, g > 0.10, g > 0.05], [5, 4, 3, 2, 1], 0),
+             [0, 5, 10, 20, 25, 30],
+             ['', 'Growth > 5%', 'Growth > 10%', 'Growth > 15%', 'Growth > 20%', 'Growth > 25%']),
+            ((accel > 0.03).astype(int), [0, 5], ['', 'Acceleration > 3%']),
+            (np.select([abs_z > 3, abs_z > 2, abs_z > 1], [3, 2, 1], 0), [0, 5, 15, 25],
+             ['', 'Z > 1', 'Z > 2', 'Z > 3']),
+            (momentum.astype(int), [0, 15], ['', 'Momentum Positive']),
+            (np.select([abs_corr > 0.8, abs_corr > 0.6], [2, 1], 0), [0, 10, 20], ['', 'Corr > 0.6', 'Corr > 0.8']),
+            (((g > 0.15) & (abs_z > 2)).astype(int), [0, 10], ['', 'Compound Growth+Deviation']),
+        ]
+        score = sum(np.asarray(points)[tier] for tier, points, _ in rules)
+
+        # Only a few hundred tier combinations exist: number each one (mixed radix over the rules)
+        # and join the notes once per combination that occurs
+        radices = [len(points) for _, points, _ in rules]
+        combo = np.zeros(len(indicators), dtype='int64')
+        for (tier, _, _), radix in zip(rules, radices):
+            combo = combo * radix + tier
+        combo_notes = np.full(np.prod(radices), '', dtype=object)
+        for code in np.flatnonzero(np.bincount(combo, minlength=len(combo_notes))):
+            tiers = np.unravel_index(code, radices)
+            combo_notes[code] = "; ".join(notes[t] for (_, _, notes), t in zip(rules, tiers) if t)
+
+        scores = pd.DataFrame({
+            'date_key': indicators.index.to_numpy(),
+            'risk_score': score,
+            'risk_level': np.select([score > 60, score > 40], ['High', 'Medium'], 'Low'),
+            'notes': combo_notes[combo],
+            'run_type': 'bulk',
+            'calculation_timestamp': pd.Timestamp.now(),
+        })
+        if 'region' in indicators.columns:
+            scores.insert(0, 'region', indicators['region'].to_numpy())
+        return scores
+
+    def calculate_enhanced_bubble_scores(self, input_df=None):
+        if input_df is None and self.execution_mode == 'sql':
+            return self.score_indicators(self.load_indicators())
+
+        indicators = self.load_stored_indicators() if input_df is None else None
+        if indicators is None:
+            df = input_df if input_df is not None else self.load_data()
+            indicators = self.calculate_indicators(df)
+        return self.score_indicators(indicators.iloc[20:])
 
     def store_bulk_scores(self, df_scores):
         engine = self.sf_connector.get_engine()
@@ -117,9 +259,12 @@ class BubbleDetector:
         print("✅ Bulk bubble risk scores stored in Snowflake.")
 
     def calculate_latest_score(self):
-        df = self.load_data()
-        recent_df = df.iloc[-25:].copy()  # use enough rows for indicators
-        score_df = self.calculate_enhanced_bubble_scores(recent_df)
+        if self.execution_mode == 'sql':
+            score_df = self.score_indicators(self.load_indicators().iloc[-1:])
+        else:
+            df = self.load_data()
+            recent_df = df.iloc[-25:].copy()  # use enough rows for indicators
+            score_df = self.calculate_enhanced_bubble_scores(recent_df)
         latest = score_df.iloc[-1:].copy()
         latest['run_type'] = 'live'
         latest['calculation_timestamp'] = pd.Timestamp.now()
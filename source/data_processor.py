@@ -4,12 +4,125 @@ import pandas as pd
 import numpy as np
 from source.utils.snowflake_connector import SnowflakeConnector
 from source.utils.snowflake_schema_manager import SnowflakeSchemaManager
+from source.utils.obt_snapshot import OBTSnapshotStore
+from source.utils.staging_loader import ConcurrentStagingLoader
+
+# Staging tables and the COPY that fills each one from its stage
+STAGING_TABLE_LOADS = [
+    # ✅ Load Home Price Index data
+    {
+        'table': 'housing_price_staging',
+        'create': """
+        CREATE OR REPLACE TABLE housing_price_staging (
+            Period STRING,
+            Quarterly_avg_Home_Price_Index FLOAT
+        );
+        """,
+        'copy': """
+        COPY INTO housing_price_staging
+        FROM @housing_data_stage/home_price_index_quarterly.csv
+        FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
+        """,
+    },
+    # ✅ Load Mortgage Rate data
+    {
+        'table': 'mortgage_rates_staging',
+        'create': """
+        CREATE OR REPLACE TABLE mortgage_rates_staging (
+            Period STRING,
+            Quarterly_avg_Mortgage_Rate FLOAT
+        );
+        """,
+        'copy': """
+        COPY INTO mortgage_rates_staging
+        FROM @mortgage_data_stage/mortgage_rate_quarterly.csv
+        FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
+        """,
+    },
+    # ✅ Load One-Family Housing Starts data
+    {
+        'table': 'housing_starts_one_family_q',
+        'create': """
+        CREATE OR REPLACE TABLE housing_starts_one_family_q (
+            Period STRING,
+            Total INT,
+            Purpose_of_Construction_Built_for_Sale_Total INT,
+            Purpose_of_Construction_Built_for_Sale_Fee_Simple INT,
+            Purpose_of_Construction_Contractor_Built INT,
+            Purpose_of_Construction_Owner_Built INT,
+            Design_Type_Detached INT,
+            Design_Type_Attached INT,
+            Square_Feet_Floor_Area_Median FLOAT,
+            Square_Feet_Floor_Area_Average FLOAT
+        );
+        """,
+        'copy': """
+        COPY INTO housing_starts_one_family_q
+        FROM @starts_data_stage/one_family_units_quarterly.csv
+        FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
+        """,
+    },
+    # ✅ Load Multi-Unit Housing Starts data
+    {
+        'table': 'housing_starts_multi_units_q',
+        'create': """
+        CREATE OR REPLACE TABLE housing_starts_multi_units_q (
+            Period STRING,
+            Total_Units_in_Buildings_2plus INT,
+            Purpose_of_Construction_For_Sale INT,
+            Purpose_of_Construction_For_Rent INT,
+            Number_of_Units_2_to_4 INT,
+            Number_of_Units_5_to_9 INT,
+            Number_of_Units_10_to_19 INT,
+            Number_of_Units_20_or_More INT,
+            Square_Feet_Per_Unit_Median FLOAT,
+            Square_Feet_Per_Unit_Average FLOAT
+        );
+        """,
+        'copy': """
+        COPY INTO housing_starts_multi_units_q
+        FROM @starts_data_stage/multi_units_buildings_quarterly.csv
+        FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
+        """,
+    },
+    # ✅ Load Unemployment Rate data
+    {
+        'table': 'unemployment_rate_staging',
+        'create': """
+        CREATE OR REPLACE TABLE unemployment_rate_staging (
+            Period STRING,
+            Unemployment_Rate FLOAT
+        );
+        """,
+        'copy': """
+        COPY INTO unemployment_rate_staging
+        FROM @cpi_unemp_data_stage/unemployment_rate_quarterly.csv
+        FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
+        """,
+    },
+    # ✅ Load CPI data
+    {
+        'table': 'cpi_staging',
+        'create': """
+        CREATE OR REPLACE TABLE cpi_staging (
+            Period STRING,
+            Consumer_Price_Index FLOAT
+        );
+        """,
+        'copy': """
+        COPY INTO cpi_staging
+        FROM @cpi_unemp_data_stage/cpi_quarterly.csv
+        FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
+        """,
+    },
+]
 
 class HousingDataProcessor:
     def __init__(self):
         """Initialize the data processor with required configurations."""
         self.sf_connector = SnowflakeConnector()
         self.schema_manager = SnowflakeSchemaManager()
+        self.snapshot_store = OBTSnapshotStore()
         self.raw_data_path = 'data/processed/'
 
         # ✅ Ensure data directory exists
@@ -61,33 +174,41 @@ class HousingDataProcessor:
         #         print(f"❌ Failed to download {filename}.")
 
     # 🔹 Step 2: Upload Data to Snowflake Stage
-    def upload_data_to_snowflake_stage(self, conn):
-        """Upload transformed quarterly CSV files to the correct Snowflake stage."""
-        print("🚀 Starting upload to Snowflake Staging...")
-        cur = conn.cursor()
-
+    def stage_for_file(self, filename):
+        """Return the Snowflake stage a processed CSV belongs to, or None if unrecognized."""
+        if "home_price_index" in filename.lower():
+            return "housing_data_stage"
+        elif "mortgage_rate" in filename.lower():
+            return "mortgage_data_stage"
+        elif "one_family" in filename.lower() or "multi_units" in filename.lower():
+            return "starts_data_stage"
+        elif "unemployment" in filename.lower() or "cpi" in filename.lower():
+            return "cpi_unemp_data_stage"
+        return None
+
+    def list_stage_uploads(self):
+        """(absolute file path, stage) for every processed CSV that has a stage."""
         processed_data_path = "data/processed/"
-
+        uploads = []
         for filename in os.listdir(processed_data_path):
             if filename.endswith(".csv"):
-                file_path = os.path.abspath(f"{processed_data_path}{filename}")
-
-                # ✅ Determine which stage to use
-                if "home_price_index" in filename.lower():
-                    stage = "housing_data_stage"
-                elif "mortgage_rate" in filename.lower():
-                    stage = "mortgage_data_stage"
-                elif "one_family" in filename.lower() or "multi_units" in filename.lower():
-                    stage = "starts_data_stage"
-                elif "unemployment" in filename.lower() or "cpi" in filename.lower():
-                    stage = "cpi_unemp_data_stage"
-                else:
+                stage = self.stage_for_file(filename)
+                if stage is None:
                     print(f"⚠️ Skipping unrecognized file: {filename}")
                     continue
+                uploads.append((os.path.abspath(f"{processed_data_path}{filename}"), stage))
+        return uploads
 
-                print(f"🔹 Uploading {filename} to {stage} ...")
-                cur.execute(f"PUT file://{file_path} @{stage} AUTO_COMPRESS=FALSE;")
-                print(f"✅ Uploaded {filename} to {stage}")
+    def upload_data_to_snowflake_stage(self, conn):
+        """Upload transformed quarterly CSV files to the correct Snowflake stage."""
+        print("🚀 Starting upload to Snowflake Staging...")
+        cur = conn.cursor()
+
+        for file_path, stage in self.list_stage_uploads():
+            filename = os.path.basename(file_path)
+            print(f"🔹 Uploading {filename} to {stage} ...")
+            cur.execute(f"PUT file://{file_path} @{stage} AUTO_COMPRESS=FALSE;")
+            print(f"✅ Uploaded {filename} to {stage}")
 
         conn.commit()
         cur.close()
@@ -100,104 +221,38 @@ class HousingDataProcessor:
 
         print("🚀 Loading staged data into Snowflake tables...")
 
-        # ✅ Load Home Price Index data
-        cur.execute("""
-            CREATE OR REPLACE TABLE housing_price_staging (
-                Period STRING,
-                Quarterly_avg_Home_Price_Index FLOAT
-            );
-        """)
-        cur.execute("""
-            COPY INTO housing_price_staging
-            FROM @housing_data_stage/home_price_index_quarterly.csv
-            FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
-        """)
-
-        # ✅ Load Mortgage Rate data
-        cur.execute("""
-            CREATE OR REPLACE TABLE mortgage_rates_staging (
-                Period STRING,
-                Quarterly_avg_Mortgage_Rate FLOAT
-            );
-        """)
-        cur.execute("""
-            COPY INTO mortgage_rates_staging
-            FROM @mortgage_data_stage/mortgage_rate_quarterly.csv
-            FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
-        """)
-
-        # ✅ Load One-Family Housing Starts data
-        cur.execute("""
-            CREATE OR REPLACE TABLE housing_starts_one_family_q (
-                Period STRING,
-                Total INT,
-                Purpose_of_Construction_Built_for_Sale_Total INT,
-                Purpose_of_Construction_Built_for_Sale_Fee_Simple INT,
-                Purpose_of_Construction_Contractor_Built INT,
-                Purpose_of_Construction_Owner_Built INT,
-                Design_Type_Detached INT,
-                Design_Type_Attached INT,
-                Square_Feet_Floor_Area_Median FLOAT,
-                Square_Feet_Floor_Area_Average FLOAT
-            );
-        """)
-        cur.execute("""
-            COPY INTO housing_starts_one_family_q
-            FROM @starts_data_stage/one_family_units_quarterly.csv
-            FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
-        """)
-
-        # ✅ Load Multi-Unit Housing Starts data
-        cur.execute("""
-            CREATE OR REPLACE TABLE housing_starts_multi_units_q (
-                Period STRING,
-                Total_Units_in_Buildings_2plus INT,
-                Purpose_of_Construction_For_Sale INT,
-                Purpose_of_Construction_For_Rent INT,
-                Number_of_Units_2_to_4 INT,
-                Number_of_Units_5_to_9 INT,
-                Number_of_Units_10_to_19 INT,
-                Number_of_Units_20_or_More INT,
-                Square_Feet_Per_Unit_Median FLOAT,
-                Square_Feet_Per_Unit_Average FLOAT
-            );
-        """)
-        cur.execute("""
-            COPY INTO housing_starts_multi_units_q
-            FROM @starts_data_stage/multi_units_buildings_quarterly.csv
-            FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
-        """)
-
-        # ✅ Load Unemployment Rate data
-        cur.execute("""
-            CREATE OR REPLACE TABLE unemployment_rate_staging (
-                Period STRING,
-                Unemployment_Rate FLOAT
-            );
-        """)
-        cur.execute("""
-            COPY INTO unemployment_rate_staging
-            FROM @cpi_unemp_data_stage/unemployment_rate_quarterly.csv
-            FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
-        """)
-
-        # ✅ Load CPI data
-        cur.execute("""
-            CREATE OR REPLACE TABLE cpi_staging (
-                Period STRING,
-                Consumer_Price_Index FLOAT
-            );
-        """)
-        cur.execute("""
-            COPY INTO cpi_staging
-            FROM @cpi_unemp_data_stage/cpi_quarterly.csv
-            FILE_FORMAT = (TYPE = 'CSV' FIELD_OPTIONALLY_ENCLOSED_BY='"' SKIP_HEADER=1);
-        """)
+        for load in STAGING_TABLE_LOADS:
+            cur.execute(load['create'])
+            cur.execute(load['copy'])
 
         conn.commit()
         cur.close()
         print("✅ All staged data loaded successfully into Snowflake tables.")
 
+    # 🔹 Steps 2-3 (concurrent): Parallel PUTs and Asynchronous COPYs
+    def upload_data_to_snowflake_stage_concurrently(self, conn):
+        """Upload all processed CSVs in parallel; returns the per-file report."""
+        loader = ConcurrentStagingLoader(conn)
+        return loader.upload_files(self.list_stage_uploads())
+
+    def load_staged_data_concurrently(self, conn):
+        """Submit every staging table load as an asynchronous query and wait for all of them."""
+        loader = ConcurrentStagingLoader(conn)
+        return loader.load_tables(STAGING_TABLE_LOADS)
+
+    # 🔹 Step 8: Publish a Shared OBT Snapshot
+    def publish_obt_snapshot(self):
+        """Write the refreshed OBT once as a memory-mappable Arrow snapshot for all readers."""
+        version = self.sf_connector.get_table_version('housing_market_quarterly_combined')
+        if version is not None and version == self.snapshot_store.current_version():
+            print("✅ OBT snapshot already up to date.")
+            return
+        obt_df = self.sf_connector.fetch_df(
+            "SELECT * FROM housing_market_quarterly_combined ORDER BY PERIOD",
+            parse_dates=['period']
+        )
+        self.snapshot_store.publish(obt_df, version)
+
     # 🔹 Step 4: Read and Process Data
     def process(self):
         """Main method to execute the data processing workflow with a single Snowflake connection."""
@@ -212,11 +267,11 @@ class HousingDataProcessor:
             # ✅ Step 1: Download raw files
             self.download_data_from_github()
 
-            # ✅ Step 2: Upload raw data to Snowflake stage (using the open connection)
-            self.upload_data_to_snowflake_stage(conn)  # FIXED: Passing conn
+            # ✅ Step 2: Upload raw data to Snowflake stage (parallel PUTs on the open connection)
+            self.upload_data_to_snowflake_stage_concurrently(conn)
 
-            # ✅ Step 3: Load staged data into Snowflake tables (using the same connection)
-            self.load_staged_data_to_snowflake_tables(conn)  # FIXED: Passing conn
+            # ✅ Step 3: Load staged data into Snowflake tables (asynchronous COPYs, awaited together)
+            self.load_staged_data_concurrently(conn)
 
             # ✅ Step 4: Read and clean data
             prices_df, mortgage_df, starts_df = self.read_raw_data()
@@ -231,6 +286,9 @@ class HousingDataProcessor:
             # ✅ Step 7: Load Processed Data to Snowflake Warehouse
             self.load_to_warehouse(warehouse_data)
 
+            # ✅ Step 8: Publish the refreshed OBT as a shared snapshot
+            self.publish_obt_snapshot()
+
         finally:
             # ✅ Close connection only after everything is done
             conn.close()
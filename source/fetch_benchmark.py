@@ -0,0 +1,87 @@
+import os
+import time
+import argparse
+import resource
+import tempfile
+import warnings
+import multiprocessing
+import duckdb
+import pandas as pd
+from source.utils.duckdb_connector import DuckDBConnector
+from source.utils.snowflake_connector import SnowflakeConnector
+
+VALUE_COLUMNS = [
+    'quarterly_avg_home_price_index', 'quarterly_avg_mortgage_rate', 'unemployment_rate',
+    'consumer_price_index', 'one_family_total', 'total_units_in_buildings_2plus',
+    'purpose_of_construction_built_for_sale_fee_simple',
+]
+# No ORDER BY: the table is generated in period order, and a sort would measure DuckDB, not the fetch
+QUERY = f"SELECT period AS date_key, {', '.join(VALUE_COLUMNS)} FROM {{table}}"
+
+
+def build_local_table(path, rows):
+    """OBT-shaped DuckDB table with `rows` rows: a timestamp key and seven float columns."""
+    conn = duckdb.connect(path)
+    values = ', '.join(f"random() * 100 AS {col}" for col in VALUE_COLUMNS)
+    conn.execute(f"""
+        CREATE TABLE obt_benchmark AS
+        SELECT TIMESTAMP '1900-01-01' + to_hours(i) AS period, {values}
+        FROM range({rows}) t(i)
+    """)
+    conn.close()
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_path(path_name, source, table, queue):
+    """Fetch once with one path in a fresh process; report rows, seconds and peak RSS growth."""
+    query = QUERY.format(table=table)
+    if source == 'snowflake':
+        connector = SnowflakeConnector()
+    else:
+        connector = DuckDBConnector(database=source)
+        connector._conn = duckdb.connect(source, read_only=True)
+    before = peak_rss_mb()
+    started = time.perf_counter()
+
+    if path_name == 'read_sql':
+        # The previous path: DBAPI / SQLAlchemy rows, then date parsing in pandas
+        target = connector.get_engine() if source == 'snowflake' else connector.get_connection()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            rows = len(pd.read_sql(query, target, parse_dates=['date_key']))
+    elif path_name == 'arrow':
+        rows = len(connector.fetch_df(query, parse_dates=['date_key']))
+    else:
+        rows = sum(len(batch) for batch in connector.fetch_batches(query, parse_dates=['date_key']))
+
+    seconds = time.perf_counter() - started
+    queue.put((path_name, rows, seconds, peak_rss_mb() - before))
+    connector.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pd.read_sql with the Arrow fetch paths.")
+    parser.add_argument('--rows', type=int, default=2_000_000, help="rows in the local benchmark table")
+    parser.add_argument('--snowflake-table', help="benchmark against this Snowflake table instead of DuckDB")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.snowflake_table:
+            source, table = 'snowflake', args.snowflake_table
+        else:
+            source, table = os.path.join(tmp, 'benchmark.duckdb'), 'obt_benchmark'
+            build_local_table(source, args.rows)
+            print(f"📦 Local DuckDB table: {args.rows:,} rows x {len(VALUE_COLUMNS) + 1} columns")
+
+        print(f"\n{'path':<10} {'rows':>12} {'seconds':>9} {'rows/s':>12} {'peak RSS +MB':>13}")
+        for path_name in ('read_sql', 'arrow', 'batches'):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=run_path, args=(path_name, source, table, queue))
+            proc.start()
+            name, rows, seconds, peak = queue.get()
+            proc.join()
+            print(f"{name:<10} {rows:>12,} {seconds:>9.2f} {rows / seconds:>12,.0f} {peak:>13.1f}")
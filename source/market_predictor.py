@@ -4,18 +4,44 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.linear_model import LinearRegression, Ridge, Lasso
 from source.utils.snowflake_connector import SnowflakeConnector
+from source.utils.obt_snapshot import OBTSnapshotStore
+from source.utils.bootstrap_intervals import ResidualBootstrap
+from source.utils.feature_store import FeatureStore
 from sqlalchemy import text
 
 class HousingMarketPredictor:
-    def __init__(self):
-        self.sf_connector = SnowflakeConnector()
+    # OBT column -> training column, matching the aliases in load_training_data
+    OBT_COLUMNS = {
+        'period': 'date_key',
+        'quarterly_avg_home_price_index': 'price_index',
+        'quarterly_avg_mortgage_rate': 'mortgage_rate',
+        'unemployment_rate': 'unemployment',
+        'consumer_price_index': 'cpi',
+        'one_family_total': 'one_family_total',
+        'total_units_in_buildings_2plus': 'total_units_in_buildings_2plus',
+        'purpose_of_construction_built_for_sale_fee_simple': 'purpose_of_construction_built_for_sale_fee_simple',
+    }
+    # Columns of prepare_features' output, in its order
+    FEATURE_COLUMNS = list(OBT_COLUMNS.values()) + [
+        'year', 'quarter', 'price_lag_1', 'mortgage_lag_1', 'price_lag_3', 'mortgage_lag_3',
+    ]
+
+    def __init__(self, snapshot_store=None, bootstrap=None, feature_store=None, connector=None):
+        self.sf_connector = connector or SnowflakeConnector()
+        self.snapshot_store = snapshot_store or OBTSnapshotStore()
+        self.feature_store = feature_store or FeatureStore()
+        self.bootstrap = bootstrap or ResidualBootstrap(n_boot=1000, coverage=0.9)
         self.models = {}
         self.predictions = {}
         self.metrics = {}
         self.scaler = StandardScaler()
 
     def load_training_data(self):
-        engine = self.sf_connector.get_engine()
+        # ✅ Prefer the shared memory-mapped snapshot over a per-instance warehouse read
+        df = self.snapshot_store.read_frame(self.OBT_COLUMNS)
+        if df is not None:
+            return self.clean_training_data(df)
+
         query = """
             SELECT
                 PERIOD AS date_key,
@@ -29,20 +55,33 @@ class HousingMarketPredictor:
             FROM housing_market_quarterly_combined
             ORDER BY PERIOD
         """
-        df = pd.read_sql(query, engine, parse_dates=['date_key'])
+        df = self.sf_connector.fetch_df(query, parse_dates=['date_key'])
         print("Loaded columns:", df.columns.tolist())
+        return self.clean_training_data(df)
 
+    def training_data_from_obt(self, obt_df):
+        """Select and rename training columns from an already-loaded OBT frame."""
+        df = obt_df[list(self.OBT_COLUMNS)].rename(columns=self.OBT_COLUMNS)
+        df = df.sort_values('date_key').reset_index(drop=True)
+        return self.clean_training_data(df)
+
+    def clean_training_data(self, df):
         # ✅ Data Cleaning Steps
-        df = df[df['price_index'].notna()]
-        df['purpose_of_construction_built_for_sale_fee_simple'] = (
-            df['purpose_of_construction_built_for_sale_fee_simple'].fillna(0)
-        )
+        # df may be a memory-mapped snapshot view: only rows or columns that need cleaning are
+        # copied, and a filled column replaces its original on a shallow copy of the frame
+        if df['price_index'].isna().any():
+            df = df[df['price_index'].notna()]
+        fill_col = 'purpose_of_construction_built_for_sale_fee_simple'
+        if df[fill_col].isna().any():
+            df = df.copy(deep=False)
+            df[fill_col] = df[fill_col].fillna(0)
 
         print("✅ Training data loaded and cleaned.")
         return df
 
     def prepare_features(self, df):
-        df_features = df.copy()
+        # Derived columns go on a shallow copy; the input columns are shared, not copied
+        df_features = df.copy(deep=False)
         df_features['year'] = df_features['date_key'].dt.year
         df_features['quarter'] = df_features['date_key'].dt.quarter
 
@@ -54,15 +93,37 @@ class HousingMarketPredictor:
         print("✅ Lag features created.")
         return df_features.dropna()
 
+    def load_features(self):
+        """prepare_features output for the current snapshot, read from the shared feature store when materialized."""
+        version = self.snapshot_store.current_version()
+        df = self.feature_store.read(self.FEATURE_COLUMNS, version=version) if version is not None else None
+        if df is not None:
+            return df.dropna()
+        return self.prepare_features(self.load_training_data())
+
+    def build_models(self):
+        return {
+            'linear': LinearRegression(),
+            'ridge': Ridge(alpha=1.0),
+            'lasso': Lasso(alpha=0.1)
+        }
+
+    def get_feature_columns(self, df):
+        return [col for col in df.columns if col not in ['date_key', 'price_index']]
+
     def calculate_adjusted_r2(self, r2, n, p):
         return 1 - ((1 - r2) * (n - 1)) / (n - p - 1)
 
+    def calculate_smape(self, actual, pred):
+        actual = np.array(actual)
+        pred = np.array(pred)
+        return 100 * np.mean(2 * np.abs(pred - actual) / (np.abs(actual) + np.abs(pred)))
+
     def train_models(self):
         print("🚀 Starting training...")
-        data = self.load_training_data()
-        df = self.prepare_features(data)
+        df = self.load_features()
 
-        feature_cols = [col for col in df.columns if col not in ['date_key', 'price_index']]
+        feature_cols = self.get_feature_columns(df)
         X = df[feature_cols]
         y = df['price_index']
 
@@ -72,35 +133,37 @@ class HousingMarketPredictor:
             'ridge': [],
             'lasso': []
         }
+        # Conformity scores of one-step forecasts in time order. Forecasts from the shorter windows
+        # before the first test quarter only seed the interval calibration and are not reported.
+        scores = {name: [] for name in walk_results}
+        first_end = max(window_size - self.bootstrap.calibration_window, 1)
 
-        for start in range(0, len(X) - window_size):
-            end = start + window_size
+        for end in range(first_end, len(X)):
+            start = max(end - window_size, 0)
             X_train, X_test = X.iloc[start:end], X.iloc[end:end+1]
             y_train, y_test = y.iloc[start:end], y.iloc[end:end+1]
             date_test = df.iloc[end]['date_key']
+            actual = y_test.values[0]
 
             X_train_scaled = self.scaler.fit_transform(X_train)
             X_test_scaled = self.scaler.transform(X_test)
 
-            models = {
-                'linear': LinearRegression(),
-                'ridge': Ridge(alpha=1.0),
-                'lasso': Lasso(alpha=0.1)
-            }
+            models = self.build_models()
+            # One set of resamples per window, shared by all three models
+            draws = self.bootstrap.draw(len(y_train))
 
             for name, model in models.items():
                 print(f"\n📊 Training {name.title()} model...")
                 model.fit(X_train_scaled, y_train)
                 pred = model.predict(X_test_scaled)[0]
-                walk_results[name].append((date_test, y_test.values[0], pred))
-
-        def smape(actual, pred):
-            actual = np.array(actual)
-            pred = np.array(pred)
-            return 100 * np.mean(2 * np.abs(pred - actual) / (np.abs(actual) + np.abs(pred)))
+                lower, upper = self.bootstrap.interval(model, X_train_scaled, y_train, X_test_scaled[0], draws)
+                if end >= window_size:
+                    lower_c, upper_c = self.bootstrap.widen(pred, lower, upper, scores[name])
+                    walk_results[name].append((date_test, actual, pred, lower_c, upper_c))
+                scores[name].append(self.bootstrap.score(actual, pred, lower, upper))
 
         for name, results in walk_results.items():
-            dates, actuals, preds = zip(*results)
+            dates, actuals, preds, lowers, uppers = zip(*results)
             n = len(actuals)
             p = X.shape[1]
             r2 = r2_score(actuals, preds)
@@ -110,14 +173,147 @@ class HousingMarketPredictor:
                 'RMSE': np.sqrt(mean_squared_error(actuals, preds)),
                 'R2': r2_score(actuals, preds),
                 'Adjusted_R2': adj_r2,
-                'SMAPE': smape(actuals, preds)
+                'SMAPE': self.calculate_smape(actuals, preds),
+                'Interval_Coverage': np.mean([lo <= a <= hi for a, lo, hi in zip(actuals, lowers, uppers)]),
             }
             print(f"📥 Storing predictions for {name.title()} model...")
-            self.store_predictions(dates, actuals, preds, model_name=name)
+            self.store_predictions(dates, actuals, preds, model_name=name, lowers=lowers, uppers=uppers)
 
         return self.metrics
 
-    def store_predictions(self, dates, actuals, preds, model_name):
+    def build_horizon_targets(self, y, horizons):
+        """
+        Target matrix where column h-1 is the price h quarters ahead of the last known price.
+        Horizon 1 is the same target train_models uses (price at the row, features lagged by one).
+        """
+        return pd.concat({h: y.shift(-(h - 1)) for h in range(1, horizons + 1)}, axis=1)
+
+    def train_multi_horizon_models(self, horizons=8, data=None):
+        """
+        Direct 1..horizons quarter forecasts from one walk-forward pass.
+        Each window is scaled once and every model is fitted to all horizons jointly (multi-output).
+        """
+        print(f"🚀 Starting {horizons}-horizon training...")
+        df = self.prepare_features(data) if data is not None else self.load_features()
+        df = df.reset_index(drop=True)
+        dates = df['date_key']
+        # Targets are shifted by rows, so a row step has to be a quarter step
+        quarter_index = dates.dt.year * 4 + dates.dt.quarter
+        gaps = dates[quarter_index.diff().fillna(1) != 1]
+        if len(gaps):
+            raise ValueError(f"Multi-horizon training needs contiguous quarters; gap before {gaps.iloc[0].date()}")
+
+        feature_cols = self.get_feature_columns(df)
+        X = df[feature_cols].to_numpy(dtype='float64')
+        Y = self.build_horizon_targets(df['price_index'], horizons).to_numpy(dtype='float64')
+        steps = np.arange(horizons)
+
+        window_size = int(len(X) * 0.8)
+        rows = []
+
+        for start in range(0, len(X) - window_size):
+            end = start + window_size
+            # Only train on rows whose every horizon target is observed inside the window
+            train_end = end - (horizons - 1)
+            X_train_scaled = self.scaler.fit_transform(X[start:train_end])
+            X_test_scaled = self.scaler.transform(X[end:end+1])
+
+            for name, model in self.build_models().items():
+                model.fit(X_train_scaled, Y[start:train_end])
+                preds = model.predict(X_test_scaled).ravel()
+                rows.append(pd.DataFrame({
+                    'origin_date': dates.iloc[end],
+                    'date_key': [dates.iloc[end] + pd.DateOffset(months=3 * h) for h in steps],
+                    'model_name': name,
+                    'horizon': steps + 1,
+                    'predicted_price': preds,
+                    'actual_price': Y[end],
+                }))
+
+        pred_df = pd.concat(rows, ignore_index=True)
+
+        metric_rows = []
+        p = X.shape[1]
+        for (name, horizon), group in pred_df.dropna(subset=['actual_price']).groupby(['model_name', 'horizon']):
+            actuals, preds = group['actual_price'], group['predicted_price']
+            mse = mean_squared_error(actuals, preds)
+            r2 = r2_score(actuals, preds)
+            metric_rows.append({
+                'model_name': name,
+                'horizon': horizon,
+                'n_forecasts': len(group),
+                'MSE': mse,
+                'RMSE': np.sqrt(mse),
+                'R2': r2,
+                'Adjusted_R2': self.calculate_adjusted_r2(r2, len(group), p),
+                'SMAPE': self.calculate_smape(actuals, preds),
+            })
+        metrics_df = pd.DataFrame(metric_rows)
+
+        self.horizon_metrics = metrics_df
+        print("✅ Multi-horizon walk-forward complete.")
+        return pred_df, metrics_df
+
+    def store_horizon_results(self, pred_df, metrics_df):
+        """Write all horizon predictions and all horizon metrics, one bulk insert each."""
+        engine = self.sf_connector.get_engine()
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS model_horizon_predictions (
+                    origin_date DATE,
+                    date_key DATE,
+                    model_name STRING,
+                    horizon INT,
+                    predicted_price FLOAT,
+                    actual_price FLOAT,
+                    prediction_timestamp TIMESTAMP
+                )
+            """))
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS model_horizon_metrics (
+                    model_name STRING,
+                    horizon INT,
+                    n_forecasts INT,
+                    mse FLOAT,
+                    rmse FLOAT,
+                    r2 FLOAT,
+                    adjusted_r2 FLOAT,
+                    smape FLOAT,
+                    calculation_timestamp TIMESTAMP
+                )
+            """))
+        print("✅ Horizon tables ensured in Snowflake.")
+
+        now = pd.Timestamp.now()
+        pred_df.assign(prediction_timestamp=now).to_sql(
+            'model_horizon_predictions', engine, if_exists='append', index=False, chunksize=16000
+        )
+        metrics_df.rename(columns=str.lower).assign(calculation_timestamp=now).to_sql(
+            'model_horizon_metrics', engine, if_exists='append', index=False
+        )
+        print(f"✅ {len(pred_df)} horizon predictions and {len(metrics_df)} horizon metrics appended to Snowflake.")
+
+    def fit_latest_models(self, data=None, holdout=0):
+        """
+        Fit each model on the most recent walk-forward window and keep it in self.models.
+        holdout leaves the last rows out of the window so they can be predicted out of sample.
+        Returns the feature frame so callers can score its latest row.
+        """
+        df = self.prepare_features(data) if data is not None else self.load_features()
+        feature_cols = self.get_feature_columns(df)
+
+        window_size = int(len(df) * 0.8)
+        window = df.iloc[:len(df) - holdout].iloc[-window_size:]
+        X_scaled = self.scaler.fit_transform(window[feature_cols])
+
+        self.models = self.build_models()
+        for model in self.models.values():
+            model.fit(X_scaled, window['price_index'])
+
+        print(f"✅ Latest-window models fitted on {window_size} quarters.")
+        return df
+
+    def store_predictions(self, dates, actuals, preds, model_name, lowers=None, uppers=None):
         engine = self.sf_connector.get_engine()
 
         # ✅ Ensure table exists before inserting
@@ -126,12 +322,17 @@ class HousingMarketPredictor:
                 date_key DATE,
                 model_name STRING,
                 predicted_price FLOAT,
+                predicted_lower FLOAT,
+                predicted_upper FLOAT,
                 actual_price FLOAT,
                 prediction_timestamp TIMESTAMP
             )
         """)
         with engine.begin() as conn:
             conn.execute(create_stmt)
+            # Tables created before interval bounds were stored
+            for col in ('predicted_lower', 'predicted_upper'):
+                conn.execute(text(f"ALTER TABLE model_predictions ADD COLUMN IF NOT EXISTS {col} FLOAT"))
         print("✅ model_predictions table ensured in Snowflake.")
 
         # Append predictions
@@ -139,6 +340,8 @@ class HousingMarketPredictor:
             'date_key': dates,
             'model_name': model_name,
             'predicted_price': preds,
+            'predicted_lower': lowers if lowers is not None else np.nan,
+            'predicted_upper': uppers if uppers is not None else np.nan,
             'actual_price': actuals,
             'prediction_timestamp': pd.Timestamp.now()
         })
@@ -150,18 +353,19 @@ class HousingMarketPredictor:
         """
         Load model predictions from Snowflake for a specific model.
         """
-        engine = self.sf_connector.get_engine()
         query = f"""
             SELECT
                 date_key,
                 predicted_price,
+                predicted_lower,
+                predicted_upper,
                 actual_price,
                 prediction_timestamp
             FROM model_predictions
             WHERE model_name = '{model_name}'
             ORDER BY date_key
         """
-        return pd.read_sql(query, engine, parse_dates=['date_key'])
+        return self.sf_connector.fetch_df(query, parse_dates=['date_key'])
 
 if __name__ == "__main__":
     predictor = HousingMarketPredictor()
@@ -172,3 +376,7 @@ if __name__ == "__main__":
         for name, value in metric.items():
             print(f"{name}: {value:.4f}")
 
+    horizon_preds, horizon_metrics = predictor.train_multi_horizon_models(horizons=8)
+    predictor.store_horizon_results(horizon_preds, horizon_metrics)
+    print("\n📈 Multi-Horizon Performance (Walk-Forward Simulation):")
+    print(horizon_metrics[['model_name', 'horizon', 'RMSE', 'Adjusted_R2', 'SMAPE']].to_string(index=False))
@@ -0,0 +1,97 @@
+import os
+import argparse
+from source.data_processor import HousingDataProcessor
+from source.bubble_detection import BubbleDetector
+from source.market_predictor import HousingMarketPredictor
+from source.utils.pipeline_runner import Stage, PipelineRunner, file_fingerprint
+
+OBT_TABLE = 'housing_market_quarterly_combined'
+
+
+def build_refresh_pipeline(processor):
+    """
+    End-to-end refresh as a dependency graph:
+
+        download -> stage_upload -> load_staging_tables -> obt_version -> publish_snapshot -> features
+                                                                                                 |-> forecast
+                                                                                                 |-> bubble_scores
+
+    Forecasting and bubble scoring run concurrently. Every stage reruns only when the
+    content of its inputs changed, so an unchanged download leaves Snowflake untouched
+    and the models are retrained only when the OBT itself changed.
+    """
+
+    def download():
+        processor.download_data_from_github()
+        path = processor.raw_data_path
+        return {
+            filename: file_fingerprint(os.path.join(path, filename))
+            for filename in sorted(os.listdir(path)) if filename.endswith('.csv')
+        }
+
+    def stage_upload(processed_files):
+        processor.upload_data_to_snowflake_stage_concurrently(processor.sf_connector.get_connection())
+        return processed_files
+
+    def load_staging_tables(staged_files):
+        processor.load_staged_data_concurrently(processor.sf_connector.get_connection())
+        return staged_files
+
+    def obt_version(staging_tables):
+        # The OBT is rebuilt in the warehouse from the staging tables; its LAST_ALTERED is the data version
+        return processor.sf_connector.get_table_version(OBT_TABLE)
+
+    def publish_snapshot(obt_version):
+        processor.publish_obt_snapshot()
+        return processor.snapshot_store.current_version()
+
+    def features(snapshot_version):
+        predictor = HousingMarketPredictor()
+        predictor.feature_store.materialize(predictor.load_training_data(), snapshot_version)
+        return snapshot_version
+
+    def forecast(feature_version):
+        predictor = HousingMarketPredictor()
+        metrics = predictor.train_models()
+        horizon_preds, horizon_metrics = predictor.train_multi_horizon_models(horizons=8)
+        predictor.store_horizon_results(horizon_preds, horizon_metrics)
+        return {'forecast_metrics': metrics, 'horizon_metrics': horizon_metrics}
+
+    def bubble_scores(feature_version):
+        detector = BubbleDetector()
+        df_scores = detector.calculate_enhanced_bubble_scores()
+        detector.store_bulk_scores(df_scores)
+        latest = df_scores.iloc[-1]
+        return {'date_key': latest['date_key'], 'risk_score': latest['risk_score'], 'rows': len(df_scores)}
+
+    stages = [
+        Stage('download', download, outputs=['processed_files'], always_run=True),
+        Stage('stage_upload', stage_upload, inputs=['processed_files'], outputs=['staged_files']),
+        Stage('load_staging_tables', load_staging_tables, inputs=['staged_files'], outputs=['staging_tables']),
+        # Always checked: the OBT can also change without new files (e.g. a warehouse-side rebuild)
+        Stage('obt_version', obt_version, inputs=['staging_tables'], outputs=['obt_version'], always_run=True),
+        Stage('publish_snapshot', publish_snapshot, inputs=['obt_version'], outputs=['snapshot_version']),
+        Stage('features', features, inputs=['snapshot_version'], outputs=['feature_version']),
+        Stage('forecast', forecast, inputs=['feature_version'], outputs=['forecast_metrics', 'horizon_metrics']),
+        Stage('bubble_scores', bubble_scores, inputs=['feature_version'], outputs=['latest_bubble_score']),
+    ]
+    return PipelineRunner(stages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh data, snapshot, forecasts and bubble scores.")
+    parser.add_argument('--targets', nargs='*', help="stages to bring up to date (default: all)")
+    parser.add_argument('--force', nargs='*', default=[], help="stages to rerun even if unchanged")
+    args = parser.parse_args()
+
+    processor = HousingDataProcessor()
+    processor.schema_manager.use_existing_schema()
+    try:
+        runner = build_refresh_pipeline(processor)
+        status = runner.run(targets=args.targets, force=set(args.force))
+    finally:
+        processor.sf_connector.close()
+
+    print("\n📋 Refresh summary:")
+    for name, outcome in status.items():
+        print(f"{name}: {outcome}")
@@ -0,0 +1,323 @@
+import os
+import json
+import asyncio
+from collections import OrderedDict
+from urllib.parse import parse_qs
+import numpy as np
+import pandas as pd
+from source.bubble_detection import BubbleDetector
+from source.market_predictor import HousingMarketPredictor
+from source.utils.snowflake_connector import SnowflakeConnector
+from source.utils.obt_snapshot import OBTSnapshotStore
+
+OBT_TABLE = 'housing_market_quarterly_combined'
+
+
+class InvalidParameter(ValueError):
+    """A query parameter that failed validation; the only error the service answers with 400."""
+
+
+def date_param(params, name):
+    if name not in params:
+        return None
+    try:
+        return np.datetime64(params[name], 'D')
+    except ValueError:
+        raise InvalidParameter(f"{name} must be a date (YYYY-MM-DD), got {params[name]!r}") from None
+
+
+def positive_int_param(params, name):
+    if name not in params:
+        return None
+    value = params[name]
+    if not value.isdigit() or int(value) <= 0:
+        raise InvalidParameter(f"{name} must be a positive integer, got {value!r}")
+    return int(value)
+
+
+def float_param(params, name):
+    try:
+        return float(params[name])
+    except ValueError:
+        raise InvalidParameter(f"{name} must be a number, got {params[name]!r}") from None
+
+
+class ServiceState:
+    """
+    Immutable in-memory copy of everything the service answers from.
+    A refresh builds a new ServiceState and swaps the reference, so requests never see a half-built state.
+    """
+
+    def __init__(self, version, scores, models, latest_features):
+        self.version = version
+        self.loaded_at = pd.Timestamp.now().isoformat()
+        self.scores = scores
+        self.models = models
+        self.latest_features = latest_features
+        self.score_dates = np.array([s['date_key'] for s in scores], dtype='datetime64[D]')
+
+    @classmethod
+    def build(cls, version, obt_df=None, snapshot_store=None):
+        detector = BubbleDetector(snapshot_store=snapshot_store)
+        predictor = HousingMarketPredictor(snapshot_store=snapshot_store)
+
+        if obt_df is not None:
+            df_scores = detector.calculate_enhanced_bubble_scores(detector.data_from_obt(obt_df))
+            feature_df = predictor.fit_latest_models(predictor.training_data_from_obt(obt_df), holdout=1)
+        else:
+            df_scores = detector.calculate_enhanced_bubble_scores()
+            feature_df = predictor.fit_latest_models(holdout=1)
+
+        scores = [
+            {
+                'date_key': row.date_key.date().isoformat(),
+                'risk_score': float(row.risk_score),
+                'risk_level': row.risk_level,
+                'notes': row.notes,
+            }
+            for row in df_scores.itertuples()
+        ]
+
+        # Keep only the arrays needed to predict: scaler moments and linear coefficients
+        feature_cols = predictor.get_feature_columns(feature_df)
+        models = {
+            name: {
+                'features': feature_cols,
+                'mean': predictor.scaler.mean_.copy(),
+                'scale': predictor.scaler.scale_.copy(),
+                'coef': np.asarray(model.coef_, dtype='float64').ravel(),
+                'intercept': float(model.intercept_),
+            }
+            for name, model in predictor.models.items()
+        }
+
+        # The models are fitted without the latest complete quarter, so its prediction is out of sample
+        latest = feature_df.iloc[-1]
+        latest_features = {
+            'date_key': latest['date_key'].date().isoformat(),
+            'actual_price': float(latest['price_index']),
+            'values': latest[feature_cols].to_numpy(dtype='float64'),
+        }
+        return cls(version, scores, models, latest_features)
+
+    def predict(self, model_name, overrides=None):
+        model = self.models[model_name]
+        x = self.latest_features['values'].copy()
+        for name, value in (overrides or {}).items():
+            x[model['features'].index(name)] = value
+        x_scaled = (x - model['mean']) / model['scale']
+        return float(x_scaled @ model['coef'] + model['intercept'])
+
+
+class ScoringService:
+    """
+    ASGI app serving the latest bubble risk score, score history and model predictions.
+
+    Run with: uvicorn source.scoring_service:app --workers 4
+    Set SCORING_SERVICE_LOCAL_DATA=data/processed/ to serve from the local CSVs instead of Snowflake.
+    """
+
+    def __init__(self, refresh_interval=60, local_data_path=None, max_cached_responses=1024, snapshot_store=None):
+        self.refresh_interval = refresh_interval
+        self.local_data_path = local_data_path
+        self.max_cached_responses = max_cached_responses
+        self.sf_connector = SnowflakeConnector() if local_data_path is None else None
+        self.snapshot_store = snapshot_store or OBTSnapshotStore()
+        self.state = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task = None
+        self._inflight = {}
+        self._responses = OrderedDict()
+        self.routes = {
+            '/health': self.health,
+            '/scores/latest': self.latest_score,
+            '/scores/history': self.score_history,
+            '/models': self.list_models,
+            '/predictions/latest': self.latest_prediction,
+        }
+
+    # 🔹 Data loading
+
+    def current_version(self):
+        if self.local_data_path is not None:
+            paths = [os.path.join(self.local_data_path, f) for f in os.listdir(self.local_data_path)]
+            return str(max(os.path.getmtime(p) for p in paths if p.endswith('.csv')))
+        # State is loaded from the published snapshot, which can lag the warehouse table (the
+        # refresh has not published yet, or publishing failed), so its version is the one to track.
+        # The warehouse version applies only while nothing is published and loads go to Snowflake.
+        return self.snapshot_store.current_version() or self.sf_connector.get_table_version(OBT_TABLE)
+
+    def load_state(self, version):
+        if self.local_data_path is not None:
+            from source.utils.local_obt import LocalOBTBuilder
+            return ServiceState.build(version, LocalOBTBuilder(self.local_data_path).build())
+        return ServiceState.build(version, snapshot_store=self.snapshot_store)
+
+    async def refresh(self):
+        """Reload scores and coefficients if the OBT has changed since the current state was built."""
+        async with self._refresh_lock:
+            loop = asyncio.get_running_loop()
+            version = await loop.run_in_executor(None, self.current_version)
+            if self.state is not None and self.state.version == version:
+                return False
+            state = await loop.run_in_executor(None, self.load_state, version)
+            self.state = state
+            self._responses = OrderedDict()
+            print(f"✅ Scoring service state loaded for data version {version}.")
+            return True
+
+    async def _refresh_forever(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the previous state; the next tick retries
+                print(f"❌ Scoring service refresh failed: {e}")
+
+    # 🔹 Handlers: each returns (status, payload) computed from a single state
+
+    def health(self, state, params):
+        return 200, {'status': 'ok', 'data_version': state.version, 'loaded_at': state.loaded_at}
+
+    def latest_score(self, state, params):
+        if not state.scores:
+            return 503, {'error': f"No bubble scores for data version {state.version}"}
+        return 200, {'data_version': state.version, **state.scores[-1]}
+
+    def score_history(self, state, params):
+        start = date_param(params, 'start')
+        end = date_param(params, 'end')
+        limit = positive_int_param(params, 'limit')
+        lo = np.searchsorted(state.score_dates, start) if start is not None else 0
+        hi = np.searchsorted(state.score_dates, end, side='right') if end is not None else len(state.scores)
+        rows = state.scores[lo:hi]
+        if limit is not None:
+            rows = rows[-limit:]
+        return 200, {'data_version': state.version, 'scores': rows}
+
+    def list_models(self, state, params):
+        models = {
+            name: {
+                'features': model['features'],
+                'coefficients': dict(zip(model['features'], model['coef'].tolist())),
+                'intercept': model['intercept'],
+            }
+            for name, model in state.models.items()
+        }
+        return 200, {'data_version': state.version, 'models': models}
+
+    def latest_prediction(self, state, params):
+        names = [params['model']] if 'model' in params else list(state.models)
+        unknown = [name for name in names if name not in state.models]
+        if unknown:
+            return 404, {'error': f"Unknown model: {unknown[0]}"}
+
+        # Any feature passed as a query parameter overrides the latest observed value (what-if scenarios)
+        features = state.models[names[0]]['features']
+        overrides = {name: float_param(params, name) for name in params if name in features}
+        # date_key is the latest quarter with every feature observed; recent quarters still missing
+        # construction data are not predicted, so it can trail latest_score_date
+        return 200, {
+            'data_version': state.version,
+            'date_key': state.latest_features['date_key'],
+            'latest_score_date': state.scores[-1]['date_key'] if state.scores else None,
+            'out_of_sample': True,
+            'actual_price': state.latest_features['actual_price'],
+            'overrides': overrides,
+            'predictions': {name: state.predict(name, overrides) for name in names},
+        }
+
+    # 🔹 ASGI plumbing
+
+    async def render(self, path, query_string):
+        """
+        Serialize a response once per (data version, path, query), keeping the most recently
+        used max_cached_responses. Concurrent identical requests await the same in-flight computation.
+        """
+        state = self.state
+        key = (state.version, path, query_string)
+        cached = self._responses.get(key)
+        if cached is not None:
+            self._responses.move_to_end(key)
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await pending
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            response = await loop.run_in_executor(None, self._handle, state, path, query_string)
+            status = response[0]
+            if status == 200 and state is self.state:
+                self._responses[key] = response
+                # Query strings are client-controlled (what-if overrides), so evict least recently used
+                if len(self._responses) > self.max_cached_responses:
+                    self._responses.popitem(last=False)
+            future.set_result(response)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            # The error is raised to this request; awaiting requests, if any, get it from the future.
+            # Marking it retrieved stops asyncio logging it when no other request was waiting.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def _handle(self, state, path, query_string):
+        params = {k: v[-1] for k, v in parse_qs(query_string).items()}
+        try:
+            status, payload = self.routes[path](state, params)
+        except InvalidParameter as e:
+            status, payload = 400, {'error': f"Invalid request: {e}"}
+        return status, json.dumps(payload).encode()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.refresh()
+                    self._refresh_task = asyncio.create_task(self._refresh_forever())
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._refresh_task is not None:
+                    self._refresh_task.cancel()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        path = scope['path'].rstrip('/') or '/'
+        if scope['method'] != 'GET' or path not in self.routes:
+            status, body = 404, json.dumps({'error': 'Not found'}).encode()
+        elif self.state is None:
+            status, body = 503, json.dumps({'error': 'Service is still loading'}).encode()
+        else:
+            status, body = await self.render(path, scope['query_string'].decode())
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+app = ScoringService(
+    refresh_interval=int(os.getenv('SCORING_SERVICE_REFRESH_SECONDS', '60')),
+    local_data_path=os.getenv('SCORING_SERVICE_LOCAL_DATA'),
+)
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlparse
+import numpy as np
+
+DEFAULT_PATHS = [
+    '/scores/latest',
+    '/scores/history?start=2005-01-01&end=2010-12-31',
+    '/predictions/latest',
+    '/predictions/latest?model=ridge&mortgage_rate=7.5',
+]
+
+
+def run_worker(host, port, paths, deadline, latencies, errors):
+    """Issue requests over one keep-alive connection until the deadline."""
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def wait_until_ready(host, port, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Service at {host}:{port} did not become ready")
+
+
+def load_test(url, concurrency, duration, paths):
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+    wait_until_ready(host, port)
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=run_worker, args=(host, port, paths, deadline, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    print(f"\n📈 Load test: {concurrency} connections for {elapsed:.1f}s against {url}")
+    print(f"Requests: {len(ms)}  Errors: {len(errors)}  Throughput: {len(ms) / elapsed:,.0f} req/s")
+    if len(ms):
+        print(f"Latency ms  p50: {np.percentile(ms, 50):.2f}  p95: {np.percentile(ms, 95):.2f}  "
+              f"p99: {np.percentile(ms, 99):.2f}  max: {ms.max():.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the scoring service.")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--workers', type=int, default=1, help="uvicorn workers when using --local")
+    parser.add_argument('--local', action='store_true',
+                        help="start the service on the local processed CSVs instead of using a running one")
+    args = parser.parse_args()
+
+    server = None
+    if args.local:
+        port = urlparse(args.url).port or 8000
+        env = {**os.environ, 'SCORING_SERVICE_LOCAL_DATA': 'data/processed/'}
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'source.scoring_service:app',
+             '--port', str(port), '--workers', str(args.workers), '--log-level', 'warning'],
+            env=env,
+        )
+    try:
+        load_test(args.url, args.concurrency, args.duration, DEFAULT_PATHS)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
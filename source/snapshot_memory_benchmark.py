@@ -0,0 +1,106 @@
+import os
+import gc
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from source.bubble_detection import BubbleDetector
+from source.market_predictor import HousingMarketPredictor
+from source.utils.obt_snapshot import OBTSnapshotStore
+
+
+def memory_stats():
+    """RSS and PSS (proportional share of pages mapped by several processes) in MB, from /proc."""
+    stats = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Pss', 'Anonymous'):
+                stats[key] = int(value.split()[0]) / 1024
+    return stats
+
+
+def synthetic_obt(rows):
+    """OBT-shaped frame with `rows` rows, large enough for per-session copies to show up in RSS."""
+    rng = np.random.default_rng(0)
+    columns = {'period': pd.date_range('1900-01-01', periods=rows, freq='h')}
+    for col in HousingMarketPredictor.OBT_COLUMNS:
+        if col != 'period':
+            columns[col] = rng.normal(100, 10, rows)
+    return pd.DataFrame(columns)
+
+
+def open_session(mode, source):
+    """What one dashboard session holds after loading the OBT: bubble data and cleaned training data."""
+    if mode == 'copy':
+        # Equivalent of a per-session pd.read_sql: private materialized frames
+        return [BubbleDetector().data_from_obt(source), HousingMarketPredictor().training_data_from_obt(source)]
+    snapshot_store = OBTSnapshotStore(source)
+    return [
+        snapshot_store.read_frame(BubbleDetector.OBT_COLUMNS, index='date_key'),
+        HousingMarketPredictor(snapshot_store=snapshot_store).load_training_data(),
+    ]
+
+
+def run_sessions(mode, source, sessions):
+    gc.collect()
+    before = memory_stats()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        sessions_frames = list(pool.map(lambda _: open_session(mode, source), range(sessions)))
+    # Touch every page so mapped data is actually resident
+    checksum = sum(float(frame['price_index'].sum()) for frames in sessions_frames for frame in frames)
+    after = memory_stats()
+    return {key: after[key] - before[key] for key in after}, checksum
+
+
+def worker_process(mode, source, sessions, queue):
+    if mode == 'copy':
+        source = pd.read_feather(os.path.join(source, 'source.feather'))
+    baseline = memory_stats()['Pss']
+    delta, _ = run_sessions(mode, source, sessions)
+    queue.put((baseline, baseline + delta['Pss']))
+
+
+def run_workers(mode, source_dir, workers, sessions):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=worker_process, args=(mode, source_dir, sessions, queue)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    total_pss = sum(after for _, after in results)
+    added_pss = sum(after - before for before, after in results)
+    return total_pss, added_pss
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare session memory: private copies vs a shared OBT snapshot.")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=0, help="also run this many worker processes per mode")
+    args = parser.parse_args()
+
+    obt_df = synthetic_obt(args.rows)
+    print(f"📦 OBT: {args.rows:,} rows, {obt_df.memory_usage(deep=True).sum() / 2**20:.1f} MB in pandas")
+
+    with tempfile.TemporaryDirectory() as root:
+        OBTSnapshotStore(root).publish(obt_df, version='benchmark')
+        obt_df.to_feather(os.path.join(root, 'source.feather'))
+
+        copy_delta, _ = run_sessions('copy', obt_df, args.sessions)
+        snap_delta, _ = run_sessions('snapshot', root, args.sessions)
+
+        print(f"\n📈 {args.sessions} concurrent sessions in one process (memory added)")
+        print(f"Private copies : RSS +{copy_delta['Rss']:.1f} MB  anonymous +{copy_delta['Anonymous']:.1f} MB")
+        print(f"Shared snapshot: RSS +{snap_delta['Rss']:.1f} MB  anonymous +{snap_delta['Anonymous']:.1f} MB")
+
+        if args.workers:
+            copy_total, copy_added = run_workers('copy', root, args.workers, args.sessions)
+            snap_total, snap_added = run_workers('snapshot', root, args.workers, args.sessions)
+            print(f"\n📈 {args.workers} worker processes x {args.sessions} sessions (PSS across workers)")
+            print(f"Private copies : {copy_total:.1f} MB total, sessions added {copy_added:.1f} MB")
+            print(f"Shared snapshot: {snap_total:.1f} MB total, sessions added {snap_added:.1f} MB")
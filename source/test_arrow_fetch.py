@@ -0,0 +1,62 @@
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+from source.bubble_detection import BubbleDetector
+from source.utils.duckdb_connector import DuckDBConnector
+from source.utils.local_snowflake_backend import LocalSnowflakeConnection
+from source.utils.obt_snapshot import OBTSnapshotStore
+from source.utils.snowflake_connector import SnowflakeConnector
+
+QUERY = """
+    SELECT
+        PERIOD AS date_key,
+        QUARTERLY_AVG_HOME_PRICE_INDEX AS price_index,
+        QUARTERLY_AVG_MORTGAGE_RATE AS mortgage_rate
+    FROM housing_market_quarterly_combined
+    ORDER BY PERIOD
+"""
+
+
+def test_arrow_fetch_matches_read_sql():
+    connector = DuckDBConnector()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        expected = pd.read_sql(QUERY, connector.get_connection(), parse_dates=['date_key'])
+
+    df = connector.fetch_df(QUERY, parse_dates=['date_key'])
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+    assert pd.api.types.is_datetime64_any_dtype(df['date_key'])
+
+    batches = list(connector.fetch_batches(QUERY, parse_dates=['date_key'], batch_size=50))
+    assert len(batches) > 1
+    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), df)
+
+    with tempfile.TemporaryDirectory() as root:
+        detector = BubbleDetector(connector=connector, snapshot_store=OBTSnapshotStore(root))
+        pd.testing.assert_frame_equal(detector.load_data(), df.set_index('date_key'))
+
+
+def test_snowflake_fetch_types_and_batches():
+    connector = SnowflakeConnector()
+    with tempfile.TemporaryDirectory() as stage_root:
+        connector._conn = LocalSnowflakeConnection(stage_root)
+        connector.execute_query("""
+            CREATE TABLE model_predictions AS
+            SELECT DATE '2020-01-01' + INTERVAL (i * 3) MONTH AS DATE_KEY,
+                   CAST(i * 1.25 AS DECIMAL(10, 2)) AS PREDICTED_PRICE
+            FROM range(10) t(i)
+        """)
+
+        df = connector.fetch_df("SELECT * FROM model_predictions ORDER BY DATE_KEY", parse_dates=['date_key'])
+        assert df.columns.tolist() == ['date_key', 'predicted_price']
+        assert pd.api.types.is_datetime64_any_dtype(df['date_key'])
+        assert df['predicted_price'].dtype == np.float64
+        np.testing.assert_allclose(df['predicted_price'], np.arange(10) * 1.25)
+
+        empty = connector.fetch_df("SELECT * FROM model_predictions WHERE FALSE")
+        assert empty.columns.tolist() == ['date_key', 'predicted_price'] and empty.empty
+
+        batches = list(connector.fetch_batches("SELECT * FROM model_predictions ORDER BY DATE_KEY"))
+        pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), df)
+        connector.close()
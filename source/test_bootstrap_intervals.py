@@ -0,0 +1,59 @@
+import numpy as np
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression, Ridge
+from source.utils.bootstrap_intervals import ResidualBootstrap
+
+
+def synthetic_regression(n=120, p=6, noise=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, p))
+    beta = rng.normal(size=p)
+    return X, beta, lambda X_: 5.0 + X_ @ beta + rng.normal(scale=noise, size=len(X_))
+
+
+def test_smoother_weights_match_refitting():
+    X, _, sample = synthetic_regression()
+    y = sample(X)
+    x_test = X[-1] + 0.5
+    bootstrap = ResidualBootstrap()
+    rng = np.random.default_rng(1)
+
+    for model in (LinearRegression(), Ridge(alpha=3.0)):
+        model.fit(X, y)
+        w = bootstrap.smoother_weights(model, X, x_test)
+        assert np.isclose(w @ y, model.predict(x_test[None])[0])
+
+        # A refit on any other target moves the prediction by w @ (y* - y)
+        y_star = y + rng.normal(size=len(y))
+        refit = clone(model).fit(X, y_star)
+        shift = refit.predict(x_test[None])[0] - model.predict(x_test[None])[0]
+        assert np.isclose(shift, w @ (y_star - y))
+
+
+def test_interval_coverage_on_iid_noise():
+    X, _, sample = synthetic_regression(seed=2)
+    bootstrap = ResidualBootstrap(n_boot=500, coverage=0.9, seed=3)
+    X_new = np.random.default_rng(4).normal(size=(200, X.shape[1]))
+
+    y_train = sample(X)
+    model = LinearRegression().fit(X, y_train)
+    hits = 0
+    for x_new in X_new:
+        lower, upper = bootstrap.interval(model, X, y_train, x_new, bootstrap.draw(len(y_train)))
+        hits += lower <= sample(x_new[None])[0] <= upper
+    assert 0.82 <= hits / len(X_new) <= 0.97
+
+
+
+def test_widen_scales_by_conformal_quantile_of_recent_scores():
+    bootstrap = ResidualBootstrap(coverage=0.9, calibration_window=20)
+    assert bootstrap.widen(10.0, 8.0, 13.0, []) == (8.0, 13.0)
+    # Errors that stayed inside their intervals never narrow the bootstrap interval
+    assert bootstrap.widen(10.0, 8.0, 13.0, np.full(20, 0.5)) == (8.0, 13.0)
+
+    # An error of 5 against a half-width of 2.5 overran its interval twofold
+    assert bootstrap.score(15.0, 10.0, 7.5, 12.5) == 2.0
+    # Only the last 20 scores count; the ceil(21 * 0.9) = 19th smallest of 1..20 is 19
+    scores = np.concatenate([[100.0], np.arange(1.0, 21.0)])
+    lower, upper = bootstrap.widen(10.0, 8.0, 13.0, scores)
+    assert np.isclose(lower, 10.0 - 2.0 * 19) and np.isclose(upper, 10.0 + 3.0 * 19)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from source.bubble_detection import BubbleDetector
+from source.bubble_calibration import BubbleThresholdCalibrator
+from source.utils.duckdb_connector import DuckDBConnector
+
+
+def load_indicators():
+    connector = DuckDBConnector()
+    detector = BubbleDetector(connector=connector)
+    obt_df = connector.fetch_df("SELECT * FROM housing_market_quarterly_combined ORDER BY PERIOD")
+    indicators = detector.calculate_indicators(detector.data_from_obt(obt_df)).iloc[20:]
+    return detector, indicators
+
+
+def test_default_config_reproduces_current_scores():
+    detector, indicators = load_indicators()
+    calibrator = BubbleThresholdCalibrator()
+
+    scores = calibrator.score_matrix(calibrator.indicator_arrays(indicators), calibrator.default_config())
+    expected = detector.score_indicators(indicators)['risk_score'].to_numpy(dtype='float64')
+    np.testing.assert_array_equal(scores[0], expected)
+
+
+def test_chunked_sweep_matches_single_pass():
+    _, indicators = load_indicators()
+    configs = BubbleThresholdCalibrator().sample_configs(500, seed=1)
+
+    single = BubbleThresholdCalibrator().evaluate(indicators, configs)
+    # Small enough to force a chunk of a few configurations at a time
+    chunked = BubbleThresholdCalibrator(max_cells=5 * len(indicators) * 5).evaluate(indicators, configs)
+    pd.testing.assert_frame_equal(chunked, single)
+
+    assert single['hit_rate'].between(0, 1).all()
+    assert (single.loc[single['hit_rate'] > 0, 'mean_lead_quarters'] >= 0).all()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from source.bubble_detection import BubbleDetector
+from source.utils.duckdb_connector import DuckDBConnector
+
+INDICATOR_COLUMNS = ['growth', 'growth_accel', 'z_score', 'price_rate_corr']
+
+
+def test_sql_indicators_match_pandas():
+    connector = DuckDBConnector()
+    pandas_detector = BubbleDetector(connector=connector)
+    sql_detector = BubbleDetector(execution_mode='sql', connector=connector)
+
+    obt_df = connector.fetch_df("SELECT * FROM housing_market_quarterly_combined ORDER BY PERIOD")
+    expected = pandas_detector.calculate_indicators(pandas_detector.data_from_obt(obt_df)).iloc[20:]
+    actual = sql_detector.load_indicators()
+
+    assert list(actual.index) == list(expected.index)
+    np.testing.assert_allclose(
+        actual[INDICATOR_COLUMNS].to_numpy(dtype='float64'),
+        expected[INDICATOR_COLUMNS].to_numpy(dtype='float64'),
+        rtol=1e-9, atol=1e-9,
+    )
+    assert (actual['momentum'] == expected['momentum']).all()
+
+    pandas_scores = pandas_detector.score_indicators(expected)
+    sql_scores = sql_detector.score_indicators(actual)
+    cols = ['date_key', 'risk_score', 'risk_level', 'notes']
+    pd.testing.assert_frame_equal(sql_scores[cols], pandas_scores[cols])
+    print(f"✅ SQL and pandas bubble indicators match on {len(actual)} quarters.")
+
+
+def test_sql_indicators_partitioned_by_region():
+    connector = DuckDBConnector()
+    conn = connector.get_connection()
+    # Two regions with the same history must score identically and independently
+    conn.execute("""
+        CREATE OR REPLACE TABLE regional_obt AS
+        SELECT 'A' AS region, * FROM housing_market_quarterly_combined
+        UNION ALL
+        SELECT 'B' AS region, * FROM housing_market_quarterly_combined
+    """)
+    detector = BubbleDetector(execution_mode='sql', connector=connector)
+    regional = connector.fetch_df(detector.build_indicator_query(table='regional_obt', partition_by='region'))
+    national = detector.load_indicators().reset_index()
+
+    for region in ['A', 'B']:
+        part = regional[regional['region'] == region].reset_index(drop=True)
+        np.testing.assert_allclose(
+            part[INDICATOR_COLUMNS].to_numpy(dtype='float64'),
+            national[INDICATOR_COLUMNS].to_numpy(dtype='float64'),
+            rtol=1e-9, atol=1e-9,
+        )
+    print("✅ Partitioned SQL indicators match the national series per region.")
+
+
+if __name__ == "__main__":
+    test_sql_indicators_match_pandas()
+    test_sql_indicators_partitioned_by_region()
@@ -0,0 +1,97 @@
+import os
+import re
+import tempfile
+import pandas as pd
+from source.data_processor import STAGING_TABLE_LOADS
+from source.utils.staging_loader import ConcurrentStagingLoader, StagingLoadError
+from source.utils.local_snowflake_backend import LocalSnowflakeConnection, LocalSnowflakeCursor
+
+LATENCY = 0.3
+
+
+def staged_files():
+    """(local path, stage) for every file the staging COPYs read."""
+    uploads = []
+    for load in STAGING_TABLE_LOADS:
+        stage, filename = re.search(r"@(\w+)/(\S+)", load['copy']).groups()
+        uploads.append((os.path.abspath(f"data/processed/{filename}"), stage))
+    return uploads
+
+
+def test_concurrent_upload_and_async_copy():
+    with tempfile.TemporaryDirectory() as stage_root:
+        conn = LocalSnowflakeConnection(stage_root, query_latency=LATENCY)
+        loader = ConcurrentStagingLoader(conn, poll_interval=0.02)
+
+        upload_report = loader.upload_files(staged_files())
+        assert all(r['status'] == 'UPLOADED' for r in upload_report.values())
+        # Every PUT was running at the same time, not one after another
+        assert conn.max_in_flight == len(staged_files())
+
+        conn.max_in_flight = 0
+        load_report = loader.load_tables(STAGING_TABLE_LOADS)
+        for (path, _), load in zip(staged_files(), STAGING_TABLE_LOADS):
+            assert load_report[load['table']]['rows_loaded'] == len(pd.read_csv(path))
+        # All CREATEs, then all COPYs, were in flight together
+        assert conn.max_in_flight == len(STAGING_TABLE_LOADS)
+        conn.close()
+        print(f"✅ {conn.max_in_flight} staging queries ran concurrently.")
+
+
+def test_failed_table_is_reported_without_blocking_others():
+    with tempfile.TemporaryDirectory() as stage_root:
+        conn = LocalSnowflakeConnection(stage_root)
+        loader = ConcurrentStagingLoader(conn, poll_interval=0.01)
+        loader.upload_files(staged_files())
+
+        loads = STAGING_TABLE_LOADS + [{
+            'table': 'missing_staging',
+            'create': "CREATE OR REPLACE TABLE missing_staging (Period STRING);",
+            'copy': "COPY INTO missing_staging FROM @housing_data_stage/not_uploaded.csv "
+                    "FILE_FORMAT = (TYPE = 'CSV' SKIP_HEADER=1);",
+        }]
+        try:
+            loader.load_tables(loads)
+            raise AssertionError("expected StagingLoadError")
+        except StagingLoadError as e:
+            assert e.report['missing_staging']['status'] == 'FAILED'
+            assert 'not_uploaded.csv' in e.report['missing_staging']['error']
+            assert all(e.report[load['table']]['status'] == 'LOADED' for load in STAGING_TABLE_LOADS)
+        conn.close()
+
+
+class RejectingCursor(LocalSnowflakeCursor):
+    """Cursor whose execute_async raises before submitting, like a dropped connection would."""
+
+    def execute_async(self, sql):
+        if 'rejected_staging' in sql:
+            raise ConnectionError("connection reset while submitting")
+        return super().execute_async(sql)
+
+
+def test_submit_failure_is_reported_with_the_other_tables():
+    with tempfile.TemporaryDirectory() as stage_root:
+        conn = LocalSnowflakeConnection(stage_root)
+        conn.cursor = lambda: RejectingCursor(conn)
+        loader = ConcurrentStagingLoader(conn, poll_interval=0.01)
+        loader.upload_files(staged_files())
+
+        loads = STAGING_TABLE_LOADS + [{
+            'table': 'rejected_staging',
+            'create': "CREATE OR REPLACE TABLE rejected_staging (Period STRING);",
+            'copy': "COPY INTO rejected_staging FROM @housing_data_stage/not_uploaded.csv;",
+        }]
+        try:
+            loader.load_tables(loads)
+            raise AssertionError("expected StagingLoadError")
+        except StagingLoadError as e:
+            assert e.report['rejected_staging']['status'] == 'FAILED'
+            assert e.report['rejected_staging']['error'] == "CREATE failed: connection reset while submitting"
+            assert all(e.report[load['table']]['status'] == 'LOADED' for load in STAGING_TABLE_LOADS)
+        conn.close()
+
+
+if __name__ == "__main__":
+    test_concurrent_upload_and_async_copy()
+    test_failed_table_is_reported_without_blocking_others()
+    test_submit_failure_is_reported_with_the_other_tables()
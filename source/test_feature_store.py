@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from source.bubble_detection import BubbleDetector
+from source.market_predictor import HousingMarketPredictor
+from source.utils.duckdb_connector import DuckDBConnector
+from source.utils.feature_store import FeatureStore, Feature, DEFAULT_FEATURES
+from source.utils.obt_snapshot import OBTSnapshotStore
+
+
+def consumers(root):
+    connector = DuckDBConnector()
+    obt_df = connector.fetch_df("SELECT * FROM housing_market_quarterly_combined ORDER BY PERIOD")
+    snapshot_store = OBTSnapshotStore(os.path.join(root, 'snapshots'))
+    snapshot_store.publish(obt_df, version='v1')
+    feature_store = FeatureStore(os.path.join(root, 'features'))
+    predictor = HousingMarketPredictor(snapshot_store=snapshot_store, feature_store=feature_store)
+    detector = BubbleDetector(connector=connector, snapshot_store=snapshot_store, feature_store=feature_store)
+    return obt_df, predictor, detector, feature_store
+
+
+def test_stored_features_match_consumer_computations():
+    with tempfile.TemporaryDirectory() as root:
+        obt_df, predictor, detector, feature_store = consumers(root)
+        training = predictor.training_data_from_obt(obt_df)
+        computed = feature_store.materialize(training, 'v1')
+        assert set(computed) == {f.name for f in DEFAULT_FEATURES}
+
+        expected = predictor.prepare_features(training).reset_index(drop=True)
+        pd.testing.assert_frame_equal(predictor.load_features().reset_index(drop=True), expected)
+
+        expected_scores = detector.calculate_enhanced_bubble_scores(detector.data_from_obt(obt_df))
+        stored_scores = detector.calculate_enhanced_bubble_scores()
+        cols = ['date_key', 'risk_score', 'risk_level', 'notes']
+        pd.testing.assert_frame_equal(stored_scores[cols], expected_scores[cols])
+
+        # Same version again: nothing to compute
+        assert feature_store.materialize(training, 'v1') == []
+
+
+def test_new_feature_computes_only_its_column():
+    with tempfile.TemporaryDirectory() as root:
+        obt_df, predictor, _, feature_store = consumers(root)
+        feature_store.materialize(predictor.training_data_from_obt(obt_df), 'v1')
+        version_dir = feature_store._version_dir('v1')
+        mtimes = {f: os.path.getmtime(os.path.join(version_dir, f)) for f in os.listdir(version_dir)
+                  if f.endswith('.arrow')}
+
+        extended = FeatureStore(feature_store.root, features=DEFAULT_FEATURES + [
+            Feature('growth_8q', lambda df: df['price_index'].pct_change(8), ['price_index']),
+        ])
+        df = extended.read(['date_key', 'growth_8q'])
+        assert df.columns.tolist() == ['date_key', 'growth_8q']
+        assert extended.registry('v1')['columns']['growth_8q']['kind'] == 'derived'
+        assert all(os.path.getmtime(os.path.join(version_dir, f)) == t for f, t in mtimes.items())
+
+        # A definition change recomputes that feature and the features built on it
+        changed = [Feature('growth', lambda df: df['price_index'].pct_change(4), ['price_index'], version=2)
+                   if f.name == 'growth' else f for f in DEFAULT_FEATURES]
+        assert FeatureStore(feature_store.root, features=changed).materialize(None, 'v1') == ['growth', 'growth_accel']
+
+
+def test_concurrent_readers_compute_a_new_feature_once():
+    with tempfile.TemporaryDirectory() as root:
+        obt_df, predictor, _, feature_store = consumers(root)
+        feature_store.materialize(predictor.training_data_from_obt(obt_df), 'v1')
+        calls = []
+        started = threading.Barrier(8)
+
+        def growth_8q(df):
+            calls.append(1)
+            return df['price_index'].pct_change(8)
+
+        def read(_):
+            # One store per caller, as in separate sessions and services
+            store = FeatureStore(feature_store.root, features=DEFAULT_FEATURES + [
+                Feature('growth_8q', growth_8q, ['price_index']),
+            ])
+            started.wait()
+            return store.read(['growth_8q'])
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            frames = list(pool.map(read, range(8)))
+        assert len(calls) == 1
+        for df in frames[1:]:
+            pd.testing.assert_frame_equal(df, frames[0])
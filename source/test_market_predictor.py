@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+import tempfile
+from sklearn.linear_model import Ridge
+from source.market_predictor import HousingMarketPredictor
+from source.utils.obt_snapshot import OBTSnapshotStore
+
+
+def quarterly_training_data(quarters=60, seed=0):
+    """Training frame with a strictly increasing price, so every target value identifies its quarter."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date_key': pd.date_range('1990-01-01', periods=quarters, freq='QS'),
+        'price_index': 100 + np.arange(quarters, dtype='float64'),
+        'mortgage_rate': 7 + rng.normal(size=quarters),
+        'unemployment': 5 + rng.normal(size=quarters),
+        'cpi': np.linspace(130, 300, quarters),
+        'one_family_total': rng.normal(1000, 50, quarters),
+        'total_units_in_buildings_2plus': rng.normal(300, 20, quarters),
+        'purpose_of_construction_built_for_sale_fee_simple': rng.normal(200, 10, quarters),
+    })
+
+
+class RecordingRidge(Ridge):
+    fitted_targets = []
+
+    def fit(self, X, y):
+        self.fitted_targets.append(np.asarray(y))
+        return super().fit(X, y)
+
+
+def test_horizon_targets_align_with_dates_and_never_look_ahead():
+    data = quarterly_training_data()
+    price_at = data.set_index('date_key')['price_index']
+    predictor = HousingMarketPredictor()
+    predictor.build_models = lambda: {'ridge': RecordingRidge()}
+    RecordingRidge.fitted_targets = []
+
+    pred_df, metrics_df = predictor.train_multi_horizon_models(horizons=4, data=data)
+
+    expected_dates = [origin + pd.DateOffset(months=3 * (h - 1))
+                      for origin, h in zip(pred_df['origin_date'], pred_df['horizon'])]
+    assert pred_df['date_key'].tolist() == expected_dates
+    observed = pred_df.dropna(subset=['actual_price'])
+    np.testing.assert_array_equal(observed['actual_price'], price_at.loc[observed['date_key']])
+    assert pred_df['actual_price'].isna().sum() == 1 + 2 + 3
+    assert set(metrics_df['horizon']) == {1, 2, 3, 4}
+
+    # Every window trains up to the quarter before its origin and no further
+    origins = pred_df['origin_date'].drop_duplicates()
+    assert len(origins) == len(RecordingRidge.fitted_targets)
+    for origin, targets in zip(origins, RecordingRidge.fitted_targets):
+        assert not np.isnan(targets).any()
+        assert targets.max() == price_at[origin - pd.DateOffset(months=3)]
+
+
+def test_multi_horizon_training_rejects_missing_quarters():
+    data = quarterly_training_data().drop(index=30)
+    with pytest.raises(ValueError, match="contiguous quarters"):
+        HousingMarketPredictor().train_multi_horizon_models(horizons=4, data=data)
+
+
+def test_clean_training_data_keeps_snapshot_columns_mapped():
+    obt_df = quarterly_training_data().rename(columns={v: k for k, v in HousingMarketPredictor.OBT_COLUMNS.items()})
+    with tempfile.TemporaryDirectory() as root:
+        snapshot_store = OBTSnapshotStore(root)
+        snapshot_store.publish(obt_df, version='v1')
+        mapped = snapshot_store.read_frame(HousingMarketPredictor.OBT_COLUMNS)
+        training = HousingMarketPredictor(snapshot_store=snapshot_store).load_training_data()
+        for col in ('price_index', 'mortgage_rate', 'purpose_of_construction_built_for_sale_fee_simple'):
+            assert np.shares_memory(training[col].to_numpy(), mapped[col].to_numpy()), col
+
+        # Rows or columns that need cleaning are copied, leaving the snapshot as it was
+        obt_df.loc[5, 'purpose_of_construction_built_for_sale_fee_simple'] = np.nan
+        obt_df.loc[7, 'quarterly_avg_home_price_index'] = np.nan
+        snapshot_store.publish(obt_df, version='v2')
+        training = HousingMarketPredictor(snapshot_store=snapshot_store).load_training_data()
+        assert len(training) == len(obt_df) - 1
+        assert training.loc[5, 'purpose_of_construction_built_for_sale_fee_simple'] == 0
+        assert snapshot_store.read_frame(HousingMarketPredictor.OBT_COLUMNS).isna().sum().sum() == 2
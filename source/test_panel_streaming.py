@@ -0,0 +1,57 @@
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+from source.bubble_detection import BubbleDetector
+from source.market_predictor import HousingMarketPredictor
+from source.panel_streaming import StreamingPanelExecutor, synthetic_weekly_panel
+from source.utils.duckdb_connector import DuckDBConnector
+from source.utils.partitioned_panel import PartitionedPanelStore
+
+
+def test_streamed_partitions_match_full_series():
+    connector = DuckDBConnector()
+    obt_df = connector.fetch_df("SELECT * FROM housing_market_quarterly_combined ORDER BY PERIOD")
+    detector = BubbleDetector(connector=connector)
+    predictor = HousingMarketPredictor()
+    training = predictor.training_data_from_obt(obt_df)
+    features = predictor.fit_latest_models(training)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = PartitionedPanelStore(root)
+        store.append(training.assign(region='US'))
+        assert len(store.partitions()) > 1
+
+        scores, predictions = [], []
+        StreamingPanelExecutor(store, detector=detector, predictor=predictor).run(scores.append, predictions.append)
+
+    scores = pd.concat(scores, ignore_index=True)
+    expected = detector.calculate_enhanced_bubble_scores(detector.data_from_obt(obt_df))
+    cols = ['date_key', 'risk_score', 'risk_level', 'notes']
+    pd.testing.assert_frame_equal(scores[cols], expected[cols])
+
+    predictions = pd.concat(predictions, ignore_index=True)
+    expected_preds = predictor.models['ridge'].predict(
+        predictor.scaler.transform(features[predictor.scaler.feature_names_in_])
+    )
+    np.testing.assert_allclose(predictions['predicted_price'], expected_preds)
+
+
+def peak_memory(regions):
+    with tempfile.TemporaryDirectory() as root:
+        store = PartitionedPanelStore(root)
+        for region_df in synthetic_weekly_panel(regions, start='2000-01-01'):
+            store.append(region_df)
+        tracemalloc.start()
+        summary = StreamingPanelExecutor(store, detector=BubbleDetector()).run(on_scores=lambda scores: None)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    assert summary['region'].nunique() == regions
+    return peak
+
+
+def test_peak_memory_does_not_grow_with_regions():
+    # The first run pays for one-off allocations (imports, caches) and would dwarf the others
+    peak_memory(2)
+    # Holding every partition would make 4x the regions cost ~4x the memory
+    assert peak_memory(16) < 2 * peak_memory(4)
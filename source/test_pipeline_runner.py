@@ -0,0 +1,80 @@
+import time
+import tempfile
+from source.utils.pipeline_runner import Stage, PipelineRunner
+
+
+def build_runner(cache_dir, calls, source, intervals=None):
+    intervals = {} if intervals is None else intervals
+
+    def extract():
+        calls.append('extract')
+        return source['value']
+
+    def branch(name):
+        def run(raw):
+            calls.append(name)
+            started = time.perf_counter()
+            time.sleep(0.3)
+            intervals[name] = (started, time.perf_counter())
+            return raw * 2
+        return run
+
+    def combine(left, right):
+        calls.append('combine')
+        return left + right
+
+    stages = [
+        Stage('extract', extract, outputs=['raw'], always_run=True),
+        Stage('left', branch('left'), inputs=['raw'], outputs=['left']),
+        Stage('right', branch('right'), inputs=['raw'], outputs=['right']),
+        Stage('combine', combine, inputs=['left', 'right'], outputs=['total']),
+    ]
+    return PipelineRunner(stages, cache_dir=cache_dir)
+
+
+def test_pipeline_reuses_unchanged_stages_and_runs_branches_concurrently():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        source = {'value': 1}
+
+        calls, intervals = [], {}
+        status = build_runner(cache_dir, calls, source, intervals).run()
+        assert set(status.values()) == {'ran'}
+        (left_start, left_end), (right_start, right_end) = intervals['left'], intervals['right']
+        assert left_start < right_end and right_start < left_end, "independent branches should overlap"
+
+        # Same extracted data: only the always-run stage executes
+        calls = []
+        runner = build_runner(cache_dir, calls, source)
+        status = runner.run()
+        assert calls == ['extract']
+        assert status == {'extract': 'ran', 'left': 'cached', 'right': 'cached', 'combine': 'cached'}
+        assert runner.artifacts['total'] == 4
+
+        # New data invalidates everything downstream of it
+        source['value'] = 5
+        calls = []
+        runner = build_runner(cache_dir, calls, source)
+        runner.run()
+        assert sorted(calls) == ['combine', 'extract', 'left', 'right']
+        assert runner.artifacts['total'] == 20
+
+
+def test_pipeline_skips_downstream_of_failures():
+    def broken():
+        raise RuntimeError("boom")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        runner = PipelineRunner([
+            Stage('broken', broken, outputs=['a']),
+            Stage('after', lambda a: a, inputs=['a'], outputs=['b']),
+            Stage('independent', lambda: 1, outputs=['c']),
+        ], cache_dir=cache_dir)
+        status = runner.run()
+        assert status == {'broken': 'failed', 'after': 'skipped', 'independent': 'ran'}
+        assert isinstance(runner.errors['broken'], RuntimeError)
+
+
+if __name__ == "__main__":
+    test_pipeline_reuses_unchanged_stages_and_runs_branches_concurrently()
+    test_pipeline_skips_downstream_of_failures()
+    print("✅ Pipeline runner tests passed.")
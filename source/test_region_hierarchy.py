@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from source.bubble_detection import BubbleDetector
+from source.regional_rollup import groupby_roll_up, score_hierarchy, synthetic_panel
+from source.utils.region_hierarchy import RegionHierarchy
+
+ROLL_ARGS = dict(sums=['starts'], means=['price_index', 'mortgage_rate'], weight='housing_units')
+
+
+def test_sparse_roll_up_matches_groupby():
+    membership, panel = synthetic_panel(n_zips=300, quarters=30)
+    hierarchy = RegionHierarchy(membership)
+    rolled = hierarchy.roll_up(panel, block_quarters=7, **ROLL_ARGS)
+
+    expected = groupby_roll_up(panel, membership, hierarchy.levels[:-1], **ROLL_ARGS)
+    merged = expected.merge(rolled, on=['level', 'region', 'date_key'], suffixes=('_expected', ''))
+    assert len(merged) == len(expected)
+    for col in ['starts', 'price_index', 'mortgage_rate']:
+        np.testing.assert_allclose(merged[col], merged[f"{col}_expected"])
+
+    national = rolled[rolled['level'] == 'national'].set_index('date_key')
+    totals = panel.groupby('date_key')['starts'].sum()
+    np.testing.assert_allclose(national['starts'], totals.loc[national.index])
+
+
+def test_missing_leaf_values_drop_out_of_weighted_means():
+    membership = pd.DataFrame({'zip': ['a', 'b', 'c'], 'county': ['x', 'x', 'y'], 'metro': 'm', 'state': 's'})
+    hierarchy = RegionHierarchy(membership)
+    panel = pd.DataFrame({
+        'zip': ['a', 'b', 'c'],
+        'date_key': pd.Timestamp('2020-01-01'),
+        'price_index': [100.0, np.nan, 130.0],
+        'housing_units': [1.0, 5.0, 2.0],
+    })
+    rolled = hierarchy.roll_up(panel, means=['price_index'], weight='housing_units').set_index(['level', 'region'])
+    assert rolled.loc[('county', 'x'), 'price_index'] == 100.0
+    assert np.isnan(rolled.loc[('zip', 'b'), 'price_index'])
+    assert np.isclose(rolled.loc[('national', 'US'), 'price_index'], (100 + 2 * 130) / 3)
+
+
+def test_every_level_is_scored_like_a_single_series():
+    membership, panel = synthetic_panel(n_zips=40, quarters=48)
+    hierarchy = RegionHierarchy(membership)
+    rolled = hierarchy.roll_up(panel, **ROLL_ARGS)
+    detector = BubbleDetector()
+
+    scores = score_hierarchy(detector, rolled)
+    assert set(scores['level']) == set(hierarchy.levels)
+    assert len(scores) == len(hierarchy.nodes) * (48 - 20)
+
+    national = rolled[rolled['level'] == 'national'].set_index('date_key')
+    expected = detector.calculate_enhanced_bubble_scores(national[['price_index', 'mortgage_rate']])
+    actual = scores[scores['level'] == 'national'].reset_index(drop=True)
+    cols = ['date_key', 'risk_score', 'notes']
+    pd.testing.assert_frame_equal(actual[cols], expected[cols])
@@ -0,0 +1,142 @@
+import gc
+import json
+import time
+import asyncio
+import tempfile
+from source.scoring_service import ScoringService, ServiceState
+from source.utils.duckdb_connector import DuckDBConnector
+from source.utils.obt_snapshot import OBTSnapshotStore
+
+
+def loaded_service(**kwargs):
+    service = ScoringService(local_data_path='data/processed/', **kwargs)
+    asyncio.run(service.refresh())
+    return service
+
+
+def get(service, path, query=''):
+    """Send one GET through the ASGI interface and return (status, decoded body)."""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode()}
+    asyncio.run(service(scope, None, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+def test_history_filters_by_date_and_limit():
+    service = loaded_service()
+    status, body = get(service, '/scores/history', 'start=2005-01-01&end=2010-12-31')
+    assert status == 200
+    dates = [row['date_key'] for row in body['scores']]
+    assert dates[0] == '2005-01-01' and dates[-1] == '2010-10-01'
+    assert len(dates) == 24
+
+    status, body = get(service, '/scores/history', 'start=2005-01-01&end=2010-12-31&limit=3')
+    assert [row['date_key'] for row in body['scores']] == dates[-3:]
+
+
+def test_bad_parameters_return_400_and_unknown_routes_404():
+    service = loaded_service()
+    for path, query in [('/scores/history', 'limit=0'), ('/scores/history', 'limit=-2'),
+                        ('/scores/history', 'limit=1.5'), ('/scores/history', 'start=not-a-date'),
+                        ('/scores/history', 'end=2010-13-45'), ('/predictions/latest', 'mortgage_rate=high')]:
+        status, body = get(service, path, query)
+        assert status == 400, query
+        assert 'error' in body
+    assert get(service, '/predictions/latest', 'model=prophet') == (404, {'error': 'Unknown model: prophet'})
+    assert get(service, '/nowhere')[0] == 404
+
+
+def test_latest_prediction_is_out_of_sample_with_actual_price():
+    service = loaded_service()
+    status, body = get(service, '/predictions/latest')
+    assert status == 200
+    assert body['out_of_sample'] and set(body['predictions']) == {'linear', 'ridge', 'lasso'}
+    assert body['date_key'] <= body['latest_score_date']
+    assert body['actual_price'] > 0
+
+    _, what_if = get(service, '/predictions/latest', 'model=ridge&mortgage_rate=12')
+    assert what_if['overrides'] == {'mortgage_rate': 12.0}
+    assert what_if['predictions']['ridge'] != body['predictions']['ridge']
+
+
+def test_identical_concurrent_requests_share_one_computation():
+    service = loaded_service(max_cached_responses=2)
+    calls = []
+    handle = service._handle
+
+    def slow_handle(state, path, query_string):
+        calls.append(query_string)
+        time.sleep(0.2)
+        return handle(state, path, query_string)
+
+    service._handle = slow_handle
+
+    async def burst():
+        return await asyncio.gather(*[service.render('/scores/history', 'limit=5') for _ in range(20)])
+
+    responses = asyncio.run(burst())
+    assert calls == ['limit=5']
+    assert len({body for _, body in responses}) == 1
+
+    # The response cache keeps only the most recently used entries
+    for query in ('limit=1', 'limit=2', 'limit=5'):
+        asyncio.run(service.render('/scores/history', query))
+    assert [key[2] for key in service._responses] == ['limit=2', 'limit=5']
+    assert calls == ['limit=5', 'limit=1', 'limit=2', 'limit=5']
+
+
+def test_handler_errors_are_not_validation_errors(caplog):
+    service = loaded_service()
+
+    def broken(state, params):
+        return {}['missing']
+
+    service.routes['/models'] = broken
+    try:
+        asyncio.run(service.render('/models', ''))
+        raise AssertionError("expected KeyError")
+    except KeyError:
+        pass
+    # Nothing else was waiting on the failed computation, and asyncio has nothing to report
+    gc.collect()
+    assert 'never retrieved' not in caplog.text
+
+
+def test_latest_score_without_scores_is_unavailable():
+    service = loaded_service()
+    loaded = service.state
+    service.state = ServiceState(loaded.version, [], loaded.models, loaded.latest_features)
+    assert get(service, '/scores/latest')[0] == 503
+    status, body = get(service, '/predictions/latest')
+    assert status == 200 and body['latest_score_date'] is None
+
+
+class WarehouseAhead:
+    """Warehouse whose OBT has been updated past every published snapshot."""
+
+    def get_table_version(self, table_name):
+        return 'v3'
+
+
+def test_state_version_follows_the_published_snapshot():
+    obt_df = DuckDBConnector().fetch_df("SELECT * FROM housing_market_quarterly_combined ORDER BY PERIOD")
+    with tempfile.TemporaryDirectory() as root:
+        snapshot_store = OBTSnapshotStore(root)
+        snapshot_store.publish(obt_df.iloc[:-4], version='v1')
+        service = ScoringService(snapshot_store=snapshot_store)
+        service.sf_connector = WarehouseAhead()
+
+        asyncio.run(service.refresh())
+        assert service.state.version == 'v1'
+        older_latest = get(service, '/scores/latest')[1]['date_key']
+        # Not republished yet: nothing to reload, whatever the warehouse says
+        assert not asyncio.run(service.refresh())
+
+        snapshot_store.publish(obt_df, version='v3')
+        assert asyncio.run(service.refresh())
+        status, body = get(service, '/scores/latest')
+        assert body['data_version'] == 'v3' and body['date_key'] > older_latest
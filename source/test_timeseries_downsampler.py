@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from source.utils.timeseries_downsampler import TimeSeriesDownsampler
+
+
+def noisy_series(n=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date_key': pd.date_range('1990-01-01', periods=n, freq='D'),
+        'price': np.cumsum(rng.normal(size=n)),
+        'rate': np.cumsum(rng.normal(size=n)),
+    })
+
+
+def test_both_methods_stay_within_budget_and_keep_endpoints():
+    y = noisy_series()['price'].to_numpy()
+    downsampler = TimeSeriesDownsampler()
+    for n_out in (4, 5, 100, 101, 999):
+        for idx in (downsampler.lttb_indices(np.arange(len(y)), y, n_out), downsampler.minmax_indices(y, n_out)):
+            assert len(idx) <= n_out
+            assert idx[0] == 0 and idx[-1] == len(y) - 1
+            assert np.all(np.diff(idx) > 0)
+
+
+def test_single_point_spike_survives():
+    df = noisy_series()
+    spike = 6_789
+    df.loc[spike, 'price'] = df['price'].max() + 1_000
+    for method in ('lttb', 'minmax'):
+        out = TimeSeriesDownsampler(max_points=200, method=method).downsample(df, 'date_key', ['price'])
+        assert len(out) <= 200
+        assert df.loc[spike, 'date_key'] in set(out['date_key'])
+
+
+def test_downsample_clips_to_viewport_with_one_neighbour_each_side():
+    df = noisy_series()
+    lo, hi = df['date_key'].iloc[2_000], df['date_key'].iloc[2_049]
+    out = TimeSeriesDownsampler(max_points=4_000).downsample(df, 'date_key', ['price', 'rate'], x_range=(lo, hi))
+    assert len(out) == 52
+    assert out['date_key'].iloc[0] == df['date_key'].iloc[1_999]
+    assert out['date_key'].iloc[-1] == df['date_key'].iloc[2_050]
+
+    out = TimeSeriesDownsampler(max_points=20).downsample(df, 'date_key', ['price', 'rate'], x_range=(lo, hi))
+    assert len(out) <= 20
+
+
+def test_figure_stats_report_rendered_points():
+    df = noisy_series()
+    fig, stats = TimeSeriesDownsampler(max_points=500, webgl_threshold=100).build_line_figure(
+        df, 'date_key', ['price'])
+    assert stats['raw_points'] == len(df)
+    assert stats['rendered_points'] == len(fig.data[0].x) <= 500
+    assert stats['webgl'] and stats['payload_bytes'] > 0
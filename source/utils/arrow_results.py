@@ -0,0 +1,26 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def arrow_to_pandas(table, parse_dates=None):
+    """
+    Convert a query result Table to pandas the way the loaders expect: lowercase column names
+    (Snowflake returns unquoted identifiers in upper case), DATE/TIMESTAMP columns as
+    datetime64 and fixed-point NUMBERs as float64. Numeric columns without nulls convert
+    without copying, and the Table's buffers are released column by column as they convert.
+    """
+    if isinstance(table, pa.RecordBatch):
+        table = pa.Table.from_batches([table])
+    table = table.rename_columns([name.lower() for name in table.column_names])
+
+    for i, field in enumerate(table.schema):
+        if pa.types.is_decimal(field.type):
+            table = table.set_column(i, field.name, pc.cast(table.column(i), pa.float64()))
+
+    df = table.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+    del table
+    for col in parse_dates or []:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col])
+    return df
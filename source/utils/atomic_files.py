@@ -0,0 +1,75 @@
+import os
+import json
+import fcntl
+import shutil
+import threading
+from contextlib import contextmanager
+
+# Names the current version of a versioned store (OBT snapshots, feature store)
+POINTER_FILE = 'CURRENT'
+LOCK_FILE = '.lock'
+
+
+def replace_atomically(path, write):
+    """Call write(tmp_path), then rename over path, so readers see the old file or the new one."""
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_json(path, payload):
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(payload, f, indent=2)
+    replace_atomically(path, write)
+
+
+def read_json(path):
+    """Parsed JSON file, or None if it does not exist."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_pointer(root, payload):
+    write_json(os.path.join(root, POINTER_FILE), payload)
+
+
+def read_pointer(root):
+    return read_json(os.path.join(root, POINTER_FILE))
+
+
+@contextmanager
+def store_lock(root):
+    """
+    Exclusive lock on a store directory, held across processes and threads.
+    flock locks belong to the open file, so two threads of one process exclude each other too.
+    """
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def prune_versions(root, names, keep_versions, keep):
+    """
+    Remove all but the keep_versions most recently modified entries of root in names (files or
+    version directories), never `keep`. Processes that still map a removed file keep its pages.
+    """
+    paths = sorted((os.path.join(root, name) for name in names), key=os.path.getmtime, reverse=True)
+    for path in paths[keep_versions:]:
+        if os.path.basename(path) == keep:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
@@ -0,0 +1,86 @@
+import numpy as np
+from sklearn.linear_model import Lasso, Ridge
+
+
+class ResidualBootstrap:
+    """
+    Residual-bootstrap prediction intervals for fitted linear models, without refitting.
+
+    OLS and ridge predictions are linear in y: pred(x) = w(x) @ y for weights w that depend
+    only on the training X. A refit on y* = yhat + e* therefore moves the prediction by
+    w @ (e* - e), so all n_boot resamples of a window are one (n_boot, n) @ (n,) product.
+    Lasso is piecewise linear in y; on its fitted active set the same identity holds with
+    the OLS weights of the active columns, which is what it is bootstrapped with.
+
+    Resampling iid residuals understates the error of a trending, autocorrelated series
+    (walk-forward coverage of 65-72% at a nominal 90%), so widen() calibrates each interval
+    against how far the last calibration_window out-of-sample errors overran theirs.
+    """
+
+    def __init__(self, n_boot=1000, coverage=0.9, seed=42, calibration_window=20):
+        self.n_boot = n_boot
+        self.coverage = coverage
+        self.calibration_window = calibration_window
+        self.rng = np.random.default_rng(seed)
+
+    def draw(self, n):
+        """Resample indices shared by every model in a window: refit draws and new-noise draws."""
+        return self.rng.integers(0, n, size=(self.n_boot, n)), self.rng.integers(0, n, size=self.n_boot)
+
+    def smoother_weights(self, model, X_train, x_test):
+        """Weights w with model.predict(x_test) == w @ y_train (up to a constant for lasso)."""
+        X_train = np.asarray(X_train, dtype='float64')
+        x_test = np.asarray(x_test, dtype='float64').ravel()
+        n = len(X_train)
+
+        coef = np.ravel(model.coef_)
+        active = np.flatnonzero(coef) if isinstance(model, Lasso) else np.arange(len(coef))
+        # Ridge penalises ||b||^2 after the same centering sklearn uses; OLS and lasso-on-active-set do not
+        alpha = model.alpha if isinstance(model, Ridge) else 0.0
+
+        means = X_train.mean(axis=0)
+        Xc = X_train[:, active] - means[active]
+        xc = x_test[active] - means[active]
+        gram = Xc.T @ Xc + alpha * np.eye(len(active))
+        return 1.0 / n + Xc @ (np.linalg.pinv(gram) @ xc)
+
+    def interval(self, model, X_train, y_train, x_test, draws):
+        """(lower, upper) prediction interval for x_test from the model already fitted on X_train."""
+        X_train = np.asarray(X_train, dtype='float64')
+        y_train = np.asarray(y_train, dtype='float64')
+        refit_idx, noise_idx = draws
+        n = len(y_train)
+
+        residuals = y_train - model.predict(X_train)
+        dof = len(np.flatnonzero(np.ravel(model.coef_))) + 1
+        # Centered and inflated so resampled residuals have roughly the error variance
+        scaled = (residuals - residuals.mean()) * np.sqrt(n / max(n - dof, 1))
+
+        w = self.smoother_weights(model, X_train, x_test)
+        refit_shift = scaled[refit_idx] @ w - residuals @ w
+        # Prediction error of a refitted model on a new observation: y_new - pred* = e_new - shift
+        errors = scaled[noise_idx] - refit_shift
+
+        tail = (1 - self.coverage) / 2
+        lower_q, upper_q = np.quantile(errors, [tail, 1 - tail])
+        pred = float(model.predict(np.asarray(x_test, dtype='float64').reshape(1, -1))[0])
+        return pred + lower_q, pred + upper_q
+
+    @staticmethod
+    def score(actual, pred, lower, upper):
+        """Out-of-sample error in units of the bootstrap interval's half-width."""
+        return abs(actual - pred) / ((upper - lower) / 2)
+
+    def widen(self, pred, lower, upper, past_scores):
+        """
+        Scale (lower, upper) about pred by the split-conformal quantile of the most recent
+        calibration_window scores of earlier one-step forecasts. Never narrows the interval.
+        """
+        scores = np.asarray(past_scores, dtype='float64')[-self.calibration_window:]
+        n = len(scores)
+        if n == 0:
+            return lower, upper
+        # The ceil((n + 1) * coverage)-th smallest score, capped at the largest for short histories
+        k = min(int(np.ceil((n + 1) * self.coverage)), n)
+        scale = max(1.0, np.partition(scores, k - 1)[k - 1])
+        return pred - (pred - lower) * scale, pred + (upper - pred) * scale
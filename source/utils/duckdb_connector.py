@@ -0,0 +1,49 @@
+import duckdb
+from source.utils.local_obt import LocalOBTBuilder
+from source.utils.arrow_results import arrow_to_pandas
+
+class DuckDBConnector:
+    """Local stand-in for SnowflakeConnector backed by an in-process DuckDB database"""
+
+    OBT_TABLE = 'housing_market_quarterly_combined'
+
+    def __init__(self, database=':memory:', processed_data_path='data/processed/'):
+        self._conn = None
+        self.database = database
+        self.processed_data_path = processed_data_path
+
+    def get_connection(self):
+        """Get DuckDB connection, creating the OBT from the processed CSVs on first use"""
+        if not self._conn:
+            self._conn = duckdb.connect(self.database)
+            tables = {row[0].lower() for row in self._conn.execute("SHOW TABLES").fetchall()}
+            if self.OBT_TABLE not in tables:
+                obt_df = LocalOBTBuilder(self.processed_data_path).build()
+                self._conn.register('obt_df', obt_df)
+                self._conn.execute(f"CREATE TABLE {self.OBT_TABLE} AS SELECT * FROM obt_df")
+                self._conn.unregister('obt_df')
+        return self._conn
+
+    def execute_query(self, query, params=None):
+        """Execute a SQL query and return results"""
+        return self.get_connection().execute(query, params or []).fetchall()
+
+    def fetch_arrow(self, query, params=None):
+        """Execute a SQL query and return the result as a pyarrow Table"""
+        return self.get_connection().execute(query, params or []).arrow()
+
+    def fetch_df(self, query, parse_dates=None, params=None):
+        """Execute a SQL query and return a DataFrame with lowercase, typed columns (via Arrow)"""
+        return arrow_to_pandas(self.fetch_arrow(query, params), parse_dates)
+
+    def fetch_batches(self, query, parse_dates=None, params=None, batch_size=100_000):
+        """Yield the result as DataFrames of up to batch_size rows"""
+        reader = self.get_connection().execute(query, params or []).fetch_record_batch(batch_size)
+        for batch in reader:
+            yield arrow_to_pandas(batch, parse_dates)
+
+    def close(self):
+        """Close the connection"""
+        if self._conn:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,195 @@
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from source.utils.atomic_files import (
+    prune_versions, read_json, read_pointer, replace_atomically, store_lock, write_json, write_pointer,
+)
+
+
+class Feature:
+    """
+    A derived column. func receives a frame holding the `inputs` columns (base columns or
+    other features) and returns a Series aligned to it. Bump version when func changes.
+    """
+
+    def __init__(self, name, func, inputs, version=1):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.version = version
+
+
+def _lag(col, periods):
+    return lambda df: df[col].shift(periods)
+
+
+# Union of what HousingMarketPredictor.prepare_features and BubbleDetector.calculate_indicators derive
+DEFAULT_FEATURES = [
+    Feature('year', lambda df: df['date_key'].dt.year, ['date_key']),
+    Feature('quarter', lambda df: df['date_key'].dt.quarter, ['date_key']),
+    Feature('price_lag_1', _lag('price_index', 1), ['price_index']),
+    Feature('mortgage_lag_1', _lag('mortgage_rate', 1), ['mortgage_rate']),
+    Feature('price_lag_3', _lag('price_index', 3), ['price_index']),
+    Feature('mortgage_lag_3', _lag('mortgage_rate', 3), ['mortgage_rate']),
+    Feature('growth', lambda df: df['price_index'].pct_change(4), ['price_index']),
+    Feature('growth_accel', lambda df: df['growth'].diff().rolling(2).mean(), ['growth']),
+    Feature('z_score', lambda df: (df['price_index'] - df['price_index'].rolling(20).mean())
+            / df['price_index'].rolling(20).std(), ['price_index']),
+    Feature('momentum', lambda df: df['price_index'].pct_change(1).rolling(3).mean() > 0, ['price_index']),
+    Feature('price_rate_corr', lambda df: df['price_index'].rolling(4).corr(df['mortgage_rate']),
+            ['price_index', 'mortgage_rate']),
+]
+
+
+class FeatureStore:
+    """
+    Base columns and derived features of one data version, one Arrow IPC file per column.
+
+    The registry (registry.json) records a signature for every stored column: its definition
+    version and the signatures of its inputs. materialize() computes only the features whose
+    signature is missing or stale, reading just their input columns, so adding or changing a
+    feature leaves every other file untouched. Reads are column-pruned and memory-mapped.
+
+    Writes hold a process-wide lock and a file lock on the store directory, so the dashboard,
+    the scoring service and refresh jobs can all materialize into the same root.
+    """
+
+    REGISTRY_FILE = 'registry.json'
+
+    # Shared by every FeatureStore in this process; the file lock covers other processes
+    _lock = threading.Lock()
+
+    def __init__(self, root='data/features/', features=None, keep_versions=2):
+        self.root = root
+        self.features = {f.name: f for f in (features if features is not None else DEFAULT_FEATURES)}
+        self.keep_versions = keep_versions
+
+    # 🔹 Layout
+
+    def _version_dir(self, version):
+        digest = hashlib.sha1(str(version).encode()).hexdigest()[:16]
+        return os.path.join(self.root, f"features-{digest}")
+
+    def _column_path(self, version, name):
+        return os.path.join(self._version_dir(version), f"{name}.arrow")
+
+    def registry(self, version):
+        return read_json(os.path.join(self._version_dir(version), self.REGISTRY_FILE))
+
+    def current_version(self):
+        pointer = read_pointer(self.root)
+        return pointer['version'] if pointer else None
+
+    # 🔹 Writing
+
+    def _signature(self, name, registry):
+        if name not in self.features:
+            # Base column: its signature is fixed when the version is first written
+            return registry['columns'][name]['signature']
+        feature = self.features[name]
+        return hashlib.sha1(json.dumps(
+            [name, feature.version, [self._signature(i, registry) for i in feature.inputs]]
+        ).encode()).hexdigest()[:16]
+
+    def _write_column(self, version, name, series):
+        # Lag and rolling features start with NaN rows. Written as float NaN rather than Arrow nulls,
+        # the file has no validity bitmap and _read_column maps it straight into a Series
+        table = pa.table({name: pa.array(series.to_numpy(), from_pandas=False)})
+        replace_atomically(
+            self._column_path(version, name),
+            lambda tmp: feather.write_feather(table, tmp, compression='uncompressed',
+                                              chunksize=max(table.num_rows, 1)),
+        )
+
+    def _dependency_order(self, names):
+        ordered, seen = [], set()
+
+        def visit(name):
+            if name in seen or name not in self.features:
+                return
+            seen.add(name)
+            for dep in self.features[name].inputs:
+                visit(dep)
+            ordered.append(name)
+
+        for name in names:
+            visit(name)
+        return ordered
+
+    def materialize(self, base_df, version, features=None):
+        """
+        Store base_df's columns as `version` (once) and compute every registered feature
+        (or just `features` and what they depend on) that is missing or stale.
+        base_df may be None for a version that is already stored. Passing it also makes
+        `version` the current one. Returns the names of the features computed.
+        """
+        with self._lock, store_lock(self.root):
+            version_dir = self._version_dir(version)
+            os.makedirs(version_dir, exist_ok=True)
+            # Read under the lock: another writer may have just stored what was missing
+            registry = self.registry(version)
+            if registry is None:
+                registry = {'version': str(version), 'rows': len(base_df), 'columns': {}}
+                for col in base_df.columns:
+                    self._write_column(version, col, base_df[col])
+                    registry['columns'][col] = {'kind': 'base', 'signature': f"base:{version}"}
+                write_json(os.path.join(version_dir, self.REGISTRY_FILE), registry)
+
+            computed = {}
+            for name in self._dependency_order(features or list(self.features)):
+                signature = self._signature(name, registry)
+                if registry['columns'].get(name, {}).get('signature') == signature:
+                    continue
+                feature = self.features[name]
+                inputs = pd.DataFrame({
+                    col: computed[col] if col in computed else self._read_column(version, col)
+                    for col in feature.inputs
+                })
+                computed[name] = feature.func(inputs)
+                self._write_column(version, name, computed[name])
+                registry['columns'][name] = {
+                    'kind': 'derived', 'signature': signature,
+                    'inputs': list(feature.inputs), 'version': feature.version,
+                }
+                # Registered after its file is in place, so readers never see a missing column
+                write_json(os.path.join(version_dir, self.REGISTRY_FILE), registry)
+
+            if base_df is not None:
+                write_pointer(self.root, {'version': str(version)})
+                versions = [d for d in os.listdir(self.root) if d.startswith('features-')]
+                prune_versions(self.root, versions, self.keep_versions, keep=os.path.basename(version_dir))
+
+        if computed:
+            print(f"✅ Features computed for version {version}: {', '.join(computed)}")
+        return list(computed)
+
+    # 🔹 Reading
+
+    def _read_column(self, version, name):
+        table = feather.read_table(self._column_path(version, name), memory_map=True)
+        return table.column(0).to_pandas()
+
+    def read(self, columns, version=None):
+        """
+        Only the requested columns of `version` (default: current), in the order given.
+        Registered features not yet stored for this version are computed first, under the write locks.
+        Returns None when the version has not been materialized.
+        """
+        version = version if version is not None else self.current_version()
+        registry = self.registry(version) if version is not None else None
+        if registry is None:
+            return None
+
+        missing = [c for c in columns if c in self.features
+                   and registry['columns'].get(c, {}).get('signature') != self._signature(c, registry)]
+        if missing:
+            self.materialize(None, version, features=missing)
+        unknown = [c for c in columns if c not in self.features and c not in registry['columns']]
+        if unknown:
+            raise KeyError(f"Columns not in feature store version {version}: {unknown}")
+
+        return pd.DataFrame({col: self._read_column(version, col) for col in columns})
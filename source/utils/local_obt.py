@@ -0,0 +1,45 @@
+import os
+import pandas as pd
+
+class LocalOBTBuilder:
+    """
+    Rebuilds housing_market_quarterly_combined from the processed quarterly CSVs.
+    Used to run the models and services without a Snowflake account.
+    """
+
+    SOURCES = {
+        "home_price_index_quarterly.csv": {
+            "Quarterly_avg_Home_Price_Index": "quarterly_avg_home_price_index",
+        },
+        "mortgage_rate_quarterly.csv": {
+            "Quarterly_avg_Mortgage_Rate": "quarterly_avg_mortgage_rate",
+        },
+        "unemployment_rate_quarterly.csv": {
+            "Unemployment_rate": "unemployment_rate",
+        },
+        "cpi_quarterly.csv": {
+            "Consumer_Price_Index": "consumer_price_index",
+        },
+        "one_family_units_quarterly.csv": {
+            "Total": "one_family_total",
+            "Purpose_of_Construction_Built_for_Sale_Fee_Simple": "purpose_of_construction_built_for_sale_fee_simple",
+        },
+        "multi_units_buildings_quarterly.csv": {
+            "Total_Units_in_Buildings_2+": "total_units_in_buildings_2plus",
+        },
+    }
+
+    def __init__(self, processed_data_path='data/processed/'):
+        self.processed_data_path = processed_data_path
+
+    def build(self):
+        """Join every source on its quarter, using the home price index as the spine."""
+        obt = None
+        for filename, columns in self.SOURCES.items():
+            df = pd.read_csv(os.path.join(self.processed_data_path, filename))
+            period_col = df.columns[0]
+            df = df[[period_col, *columns]].rename(columns={period_col: 'period', **columns})
+            obt = df if obt is None else obt.merge(df, on='period', how='left')
+
+        obt['period'] = pd.PeriodIndex(obt['period'], freq='Q').to_timestamp()
+        return obt.sort_values('period').reset_index(drop=True)
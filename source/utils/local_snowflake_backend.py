@@ -0,0 +1,168 @@
+import os
+import re
+import time
+import uuid
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import duckdb
+import pyarrow as pa
+from snowflake.connector.constants import QueryStatus
+from snowflake.connector.connection import SnowflakeConnection
+from snowflake.connector.errors import ProgrammingError
+
+PUT_PATTERN = re.compile(r"PUT\s+file://(\S+)\s+@(\w+)", re.IGNORECASE)
+COPY_PATTERN = re.compile(r"COPY\s+INTO\s+(\w+)\s+FROM\s+@(\w+)/(\S+)", re.IGNORECASE)
+SKIP_HEADER_PATTERN = re.compile(r"SKIP_HEADER\s*=\s*(\d+)", re.IGNORECASE)
+
+
+class LocalSnowflakeConnection:
+    """
+    Local stand-in for a snowflake.connector connection, backed by DuckDB.
+
+    Supports the subset the staging loaders and fetch paths use: PUT into a stage directory,
+    COPY INTO from a staged CSV, plain SQL, execute_async with query-ID status polling,
+    fetching async results, and Arrow result fetches. query_latency adds a fixed delay to every query so
+    concurrency behaves like a remote warehouse; max_in_flight records the most queries that ran at once.
+    """
+
+    def __init__(self, stage_root, database=':memory:', query_latency=0.0, max_concurrency=8):
+        self.stage_root = stage_root
+        self.query_latency = query_latency
+        self._db = duckdb.connect(database)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='local-sf')
+        self._queries = {}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    # 🔹 Query execution
+
+    def _put(self, file_path, stage):
+        stage_dir = os.path.join(self.stage_root, stage)
+        os.makedirs(stage_dir, exist_ok=True)
+        filename = os.path.basename(file_path)
+        shutil.copyfile(file_path, os.path.join(stage_dir, filename))
+        size = os.path.getsize(file_path)
+        return [(filename, filename, size, size, 'NONE', 'NONE', 'UPLOADED', '')]
+
+    def _copy(self, db, table, stage, filename, skip_header):
+        path = os.path.join(self.stage_root, stage, filename)
+        if not os.path.exists(path):
+            raise ProgrammingError(msg=f"Remote file '@{stage}/{filename}' was not found.")
+        # header=true drops the first line; further skipped lines are passed as skip
+        before = db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        db.execute(
+            f"INSERT INTO {table} SELECT * FROM read_csv(?, header = ?, skip = ?, quote = '\"')",
+            [path, skip_header > 0, max(skip_header - 1, 0)],
+        )
+        loaded = db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - before
+        return [(f"{stage}/{filename}", 'LOADED', loaded, loaded, 1, 0, None, None, None, None)]
+
+    def _run(self, sql):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.query_latency:
+            time.sleep(self.query_latency)
+        db = self._db.cursor()
+        try:
+            put = PUT_PATTERN.search(sql)
+            if put:
+                return self._put(*put.groups())
+            copy = COPY_PATTERN.search(sql)
+            if copy:
+                skip = SKIP_HEADER_PATTERN.search(sql)
+                return self._copy(db, *copy.groups(), int(skip.group(1)) if skip else 0)
+            try:
+                result = db.execute(sql.strip().rstrip(';'))
+                return result.arrow() if result.description else []
+            except duckdb.Error as e:
+                raise ProgrammingError(msg=str(e))
+        finally:
+            db.close()
+            with self._lock:
+                self.in_flight -= 1
+
+    def _submit(self, sql):
+        qid = str(uuid.uuid4())
+        with self._lock:
+            self._queries[qid] = self._executor.submit(self._run, sql)
+        return qid
+
+    # 🔹 Connection API
+
+    def cursor(self):
+        return LocalSnowflakeCursor(self)
+
+    def get_query_status(self, sf_qid):
+        future = self._queries[sf_qid]
+        if not future.done():
+            return QueryStatus.RUNNING
+        return QueryStatus.FAILED_WITH_ERROR if future.exception() else QueryStatus.SUCCESS
+
+    def get_query_status_throw_if_error(self, sf_qid):
+        status = self.get_query_status(sf_qid)
+        if status == QueryStatus.FAILED_WITH_ERROR:
+            error = self._queries[sf_qid].exception()
+            raise ProgrammingError(msg=getattr(error, 'raw_msg', None) or str(error), sfqid=sf_qid)
+        return status
+
+    is_still_running = staticmethod(SnowflakeConnection.is_still_running)
+    is_an_error = staticmethod(SnowflakeConnection.is_an_error)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._db.close()
+
+
+class LocalSnowflakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.sfqid = None
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.sfqid = self.conn._submit(sql)
+        self._result = self.conn._queries[self.sfqid].result()
+        return self
+
+    def execute_async(self, sql):
+        self.sfqid = self.conn._submit(sql)
+        return {'queryId': self.sfqid}
+
+    def get_results_from_sfqid(self, sfqid):
+        self.sfqid = sfqid
+        self._result = self.conn._queries[sfqid].result()
+
+    def _rows(self):
+        # SELECT results are kept as Arrow; PUT / COPY results are already row tuples
+        if isinstance(self._result, pa.Table):
+            self._result = list(zip(*(col.to_pylist() for col in self._result.columns)))
+        return self._result
+
+    def fetchall(self):
+        rows, self._result = self._rows(), []
+        return rows
+
+    def fetchone(self):
+        rows = self._rows()
+        return rows.pop(0) if rows else None
+
+    def fetch_arrow_all(self, force_return_table=False):
+        table, self._result = self._result, []
+        if not isinstance(table, pa.Table):
+            return None
+        return table if table.num_rows or force_return_table else None
+
+    def fetch_arrow_batches(self):
+        table, self._result = self._result, []
+        if isinstance(table, pa.Table):
+            for batch in table.to_batches():
+                yield pa.Table.from_batches([batch], schema=table.schema)
+
+    def close(self):
+        pass
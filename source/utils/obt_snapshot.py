@@ -0,0 +1,95 @@
+import os
+import hashlib
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from source.utils.atomic_files import prune_versions, read_pointer, replace_atomically, store_lock, write_pointer
+
+class OBTSnapshotStore:
+    """
+    Versioned Arrow IPC (Feather v2) snapshots of housing_market_quarterly_combined.
+
+    A snapshot is written once per data refresh. Every session and worker process opens
+    it through a memory map, so they all read the same page-cache pages instead of
+    holding their own pandas copy. Publishing a new version is atomic: the file is
+    written under a temporary name, renamed, and then the CURRENT pointer is replaced.
+    """
+
+    # Tables already mapped in this process, keyed by snapshot path
+    _open_tables = {}
+    _lock = threading.Lock()
+
+    def __init__(self, root='data/snapshots/', keep_versions=2):
+        self.root = root
+        self.keep_versions = keep_versions
+
+    def _snapshot_path(self, version):
+        digest = hashlib.sha1(str(version).encode()).hexdigest()[:16]
+        return os.path.join(self.root, f"obt-{digest}.arrow")
+
+    def publish(self, obt_df, version):
+        """Write obt_df as snapshot `version` and make it the current one."""
+        os.makedirs(self.root, exist_ok=True)
+        path = self._snapshot_path(version)
+
+        # Keep NaN as a float value rather than converting it to an Arrow null,
+        # so numeric columns stay zero-copy when read back into pandas
+        table = pa.Table.from_arrays(
+            [pa.array(obt_df[col].to_numpy(), from_pandas=False) for col in obt_df.columns],
+            names=[str(col).lower() for col in obt_df.columns],
+        )
+        # Concurrent publishers (e.g. two refresh processes) take turns moving the pointer and pruning
+        with store_lock(self.root):
+            replace_atomically(
+                path, lambda tmp: feather.write_feather(
+                    table, tmp, compression='uncompressed', chunksize=max(table.num_rows, 1)
+                )
+            )
+            write_pointer(self.root, {'version': str(version), 'file': os.path.basename(path), 'rows': table.num_rows})
+            snapshots = [f for f in os.listdir(self.root) if f.startswith('obt-') and f.endswith('.arrow')]
+            prune_versions(self.root, snapshots, self.keep_versions, keep=os.path.basename(path))
+        print(f"✅ OBT snapshot {version} published ({table.num_rows} rows).")
+        return path
+
+    def current(self):
+        """Return the CURRENT pointer ({'version', 'file', 'rows'}) or None if nothing is published."""
+        return read_pointer(self.root)
+
+    def current_version(self):
+        pointer = self.current()
+        return pointer['version'] if pointer else None
+
+    def open_table(self):
+        """Memory-map the current snapshot; the same pa.Table is shared by every caller in this process."""
+        pointer = self.current()
+        if pointer is None:
+            return None
+        path = os.path.join(self.root, pointer['file'])
+
+        with self._lock:
+            table = self._open_tables.get(path)
+            if table is None:
+                table = feather.read_table(path, memory_map=True)
+                # Drop mappings of superseded versions from this process
+                self._open_tables.clear()
+                self._open_tables[path] = table
+        return table
+
+    def read_frame(self, columns, index=None):
+        """
+        Zero-copy pandas view of the current snapshot.
+        columns maps snapshot column -> output column; selection and renaming happen in Arrow.
+        index optionally names an output column to use as the index (also without copying).
+        Returns None when no snapshot has been published.
+        """
+        table = self.open_table()
+        if table is None:
+            return None
+        table = table.select(list(columns)).rename_columns(list(columns.values()))
+        df = table.to_pandas(split_blocks=True)
+        if index is not None:
+            # set_index would copy every column; set_axis + del keeps the mapped buffers
+            df = df.set_axis(pd.Index(df[index], name=index), axis=0, copy=False)
+            del df[index]
+        return df
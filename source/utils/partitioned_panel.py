@@ -0,0 +1,75 @@
+import os
+import uuid
+import pandas as pd
+
+
+class PartitionedPanelStore:
+    """
+    A regional panel (e.g. ZIP-level, weekly) kept on disk as Parquet, one directory per
+    region and decade:
+
+        root/region=<region>/decade=<decade>/part-<id>.parquet
+
+    Rows are appended in any order and chunk size; a partition is only ever read on its own,
+    so no step needs more than one partition in memory.
+    """
+
+    def __init__(self, root='data/panel/', region_col='region', date_col='date_key'):
+        self.root = root
+        self.region_col = region_col
+        self.date_col = date_col
+
+    def _partition_dir(self, region, decade):
+        return os.path.join(self.root, f"{self.region_col}={region}", f"decade={decade}")
+
+    def append(self, df):
+        """Write df into its region/decade partitions. Returns the number of files written."""
+        dates = pd.to_datetime(df[self.date_col])
+        decades = dates.dt.year // 10 * 10
+        written = 0
+        for (region, decade), part in df.assign(**{self.date_col: dates}).groupby(
+            [df[self.region_col].astype(str), decades], sort=False
+        ):
+            path = self._partition_dir(region, decade)
+            os.makedirs(path, exist_ok=True)
+            # The region is encoded in the path, so it is not repeated in every file
+            part.drop(columns=self.region_col).to_parquet(
+                os.path.join(path, f"part-{uuid.uuid4().hex}.parquet"), index=False
+            )
+            written += 1
+        return written
+
+    def partitions(self):
+        """(region, decade) pairs on disk, each region's decades in chronological order."""
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+        prefix = f"{self.region_col}="
+        for region_dir in os.listdir(self.root):
+            if not region_dir.startswith(prefix):
+                continue
+            for decade_dir in os.listdir(os.path.join(self.root, region_dir)):
+                if decade_dir.startswith('decade='):
+                    found.append((region_dir[len(prefix):], int(decade_dir[len('decade='):])))
+        return sorted(found)
+
+    def read_partition(self, region, decade, columns=None, period='Q'):
+        """
+        One partition as a frame sorted by date. With period set, rows (e.g. weekly inputs) are
+        averaged per period; quarters never straddle a decade, so this is exact per partition.
+        """
+        path = self._partition_dir(region, decade)
+        read_cols = None if columns is None else [self.date_col] + [c for c in columns if c != self.date_col]
+        files = sorted(f for f in os.listdir(path) if f.endswith('.parquet'))
+        df = pd.concat(
+            [pd.read_parquet(os.path.join(path, f), columns=read_cols) for f in files], ignore_index=True
+        )
+
+        if period:
+            periods = df[self.date_col].dt.to_period(period).dt.start_time
+            df = df.drop(columns=self.date_col).groupby(periods.rename(self.date_col)).mean().reset_index()
+        else:
+            df = df.sort_values(self.date_col).reset_index(drop=True)
+
+        df.insert(0, self.region_col, region)
+        return df
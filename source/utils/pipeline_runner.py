@@ -0,0 +1,194 @@
+import os
+import time
+import pickle
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Stage:
+    """
+    One step of a pipeline.
+
+    func is called with the stage's inputs as keyword arguments and returns a dict with
+    one entry per declared output (or a bare value when there is exactly one output).
+    file_inputs are local paths whose contents are part of the stage fingerprint.
+    always_run stages (e.g. downloads) run every time; their outputs still decide
+    whether downstream stages have to rerun.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), file_inputs=(), always_run=False, version=1):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.file_inputs = tuple(file_inputs)
+        self.always_run = always_run
+        self.version = version
+
+
+def fingerprint(value):
+    """Stable content hash of any picklable value."""
+    return hashlib.sha256(pickle.dumps(value, protocol=4)).hexdigest()
+
+
+def file_fingerprint(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PipelineRunner:
+    """
+    Runs stages as soon as the stages producing their inputs have finished, with
+    independent branches in parallel. A stage whose input fingerprints match its
+    last successful run is skipped and its cached outputs are reused.
+    """
+
+    def __init__(self, stages, cache_dir='data/cache/pipeline/', max_workers=4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"Output '{output}' is produced by both {self.producers[output]} and {stage.name}")
+                self.producers[output] = stage.name
+        for stage in stages:
+            missing = [i for i in stage.inputs if i not in self.producers]
+            if missing:
+                raise ValueError(f"Stage {stage.name} needs inputs nobody produces: {missing}")
+        self.dependencies = {
+            stage.name: {self.producers[i] for i in stage.inputs} for stage in stages
+        }
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through stage {name}")
+            visiting.add(name)
+            for dep in self.dependencies[name]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    # 🔹 Cache
+
+    def _cache_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.pkl")
+
+    def _load_cache(self, name):
+        try:
+            with open(self._cache_path(name), 'rb') as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _save_cache(self, name, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(name)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=4)
+        os.replace(tmp_path, path)
+
+    # 🔹 Execution
+
+    def _stage_fingerprint(self, stage, artifact_fingerprints):
+        return fingerprint({
+            'stage': stage.name,
+            'version': stage.version,
+            'inputs': {i: artifact_fingerprints[i] for i in stage.inputs},
+            'files': {p: file_fingerprint(p) if os.path.exists(p) else None for p in stage.file_inputs},
+        })
+
+    def _run_stage(self, stage, artifacts, artifact_fingerprints, force):
+        stage_fp = self._stage_fingerprint(stage, artifact_fingerprints)
+        cached = self._load_cache(stage.name)
+        if cached is not None and cached['fingerprint'] == stage_fp and not stage.always_run and not force:
+            return 'cached', cached['outputs'], cached['output_fingerprints'], 0.0
+
+        started = time.perf_counter()
+        result = stage.func(**{i: artifacts[i] for i in stage.inputs})
+        if len(stage.outputs) == 1 and not (isinstance(result, dict) and set(result) == set(stage.outputs)):
+            result = {stage.outputs[0]: result}
+        result = result or {}
+        missing = [o for o in stage.outputs if o not in result]
+        if missing:
+            raise ValueError(f"Stage {stage.name} did not return outputs {missing}")
+
+        outputs = {o: result[o] for o in stage.outputs}
+        output_fps = {o: fingerprint(v) for o, v in outputs.items()}
+        self._save_cache(stage.name, {
+            'fingerprint': stage_fp, 'outputs': outputs, 'output_fingerprints': output_fps,
+        })
+        return 'ran', outputs, output_fps, time.perf_counter() - started
+
+    def run(self, targets=None, force=()):
+        """
+        Run the stages needed for `targets` (default: all). Stages named in `force` rerun
+        even when cached. Returns {stage: status} where status is 'ran', 'cached',
+        'failed' or 'skipped' (an upstream stage failed).
+        """
+        needed = set()
+        pending = list(targets or self.stages)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.dependencies[name])
+
+        artifacts, artifact_fps, status, errors = {}, {}, {}, {}
+        remaining = set(needed)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pipeline') as pool:
+            while remaining or running:
+                for name in sorted(remaining):
+                    deps = self.dependencies[name]
+                    if any(status.get(d) in ('failed', 'skipped') for d in deps):
+                        status[name] = 'skipped'
+                        remaining.discard(name)
+                        print(f"⏭️ {name} skipped (upstream failure)")
+                    elif all(status.get(d) in ('ran', 'cached') for d in deps):
+                        stage = self.stages[name]
+                        print(f"🔹 {name} started")
+                        running[pool.submit(
+                            self._run_stage, stage, dict(artifacts), dict(artifact_fps), name in force
+                        )] = name
+                        remaining.discard(name)
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        outcome, outputs, output_fps, seconds = future.result()
+                    except Exception as e:
+                        status[name] = 'failed'
+                        errors[name] = e
+                        print(f"❌ {name} failed: {e}")
+                        continue
+                    status[name] = outcome
+                    artifacts.update(outputs)
+                    artifact_fps.update(output_fps)
+                    if outcome == 'cached':
+                        print(f"✅ {name} unchanged, using cached outputs")
+                    else:
+                        print(f"✅ {name} finished in {seconds:.1f}s")
+
+        self.errors = errors
+        self.artifacts = artifacts
+        return status
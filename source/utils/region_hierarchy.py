@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+class RegionHierarchy:
+    """
+    ZIP -> county -> metro -> state -> national tree as a sparse aggregation matrix.
+
+    Every node at every level (leaves included) is a row of `matrix` (nodes x leaves) with a 1
+    for each leaf below it. All levels are aggregated straight from the leaves, so their totals
+    agree by construction, even where a metro crosses state lines.
+    """
+
+    LEVELS = ('zip', 'county', 'metro', 'state', 'national')
+
+    def __init__(self, membership, levels=LEVELS):
+        """membership: one row per leaf with a column per level; a missing top level is one 'US' node."""
+        self.levels = tuple(levels)
+        membership = membership.copy()
+        if self.levels[-1] not in membership.columns:
+            membership[self.levels[-1]] = 'US'
+        membership = membership[list(self.levels)].astype(str)
+        if membership[self.levels[0]].duplicated().any():
+            raise ValueError(f"Each {self.levels[0]} must appear once in the membership table")
+
+        self.leaves = pd.Index(membership[self.levels[0]], name=self.levels[0])
+        node_frames, rows, cols = [], [], []
+        offset = 0
+        for level in self.levels:
+            codes, regions = pd.factorize(membership[level], sort=True)
+            node_frames.append(pd.DataFrame({'level': level, 'region': regions}))
+            rows.append(codes + offset)
+            cols.append(np.arange(len(self.leaves)))
+            offset += len(regions)
+
+        self.nodes = pd.concat(node_frames, ignore_index=True)
+        self.matrix = sp.csr_matrix(
+            (np.ones(len(self.leaves) * len(self.levels)), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(offset, len(self.leaves)),
+        )
+
+    def roll_up(self, panel, sums=(), means=(), weight=None, date_col='date_key', block_quarters=40):
+        """
+        Aggregate a long leaf panel (leaf column, date_col, measures) to every node.
+
+        sums are added up (e.g. housing starts); means are weighted averages (price indices,
+        risk scores) using the `weight` column, or equal weights. Missing leaf values drop out
+        of both numerator and denominator. Each block of quarters is one sparse multiply.
+        Returns a long frame ordered by level, region and date: level, region, date_key, measures.
+        """
+        leaf_pos = self.leaves.get_indexer(panel[self.levels[0]].astype(str))
+        if (leaf_pos < 0).any():
+            raise ValueError(f"Panel has {self.levels[0]} values missing from the hierarchy")
+        date_pos, dates = pd.factorize(panel[date_col], sort=True)
+        shape = (len(self.leaves), len(dates))
+
+        def wide(col):
+            # Leaves x quarters; anything not in the panel stays NaN
+            values = np.full(shape, np.nan)
+            values[leaf_pos, date_pos] = panel[col].to_numpy(dtype='float64')
+            return values
+
+        w = wide(weight) if weight else np.ones(shape)
+        arrays = [np.nan_to_num(wide(col)) for col in sums]
+        weights = []
+        for col in means:
+            values = wide(col)
+            mask = ~np.isnan(values) & ~np.isnan(w)
+            arrays.append(np.where(mask, values * w, 0.0))
+            weights.append(np.where(mask, w, 0.0))
+        arrays += weights
+
+        totals = np.empty((len(self.nodes), len(arrays), len(dates)))
+        for start in range(0, len(dates), block_quarters):
+            block = slice(start, start + block_quarters)
+            width = len(dates[block])
+            # Every measure of the block side by side -> one nodes x (measures * quarters) product
+            stacked = np.hstack([a[:, block] for a in arrays])
+            totals[:, :, block] = (self.matrix @ stacked).reshape(len(self.nodes), len(arrays), width)
+
+        out = {col: totals[:, i] for i, col in enumerate(sums)}
+        for i, col in enumerate(means):
+            numerator = totals[:, len(sums) + i]
+            denominator = totals[:, len(sums) + len(means) + i]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out[col] = np.where(denominator > 0, numerator / denominator, np.nan)
+
+        n_dates = len(dates)
+        return pd.DataFrame({
+            'level': np.repeat(self.nodes['level'].to_numpy(), n_dates),
+            'region': np.repeat(self.nodes['region'].to_numpy(), n_dates),
+            date_col: np.tile(np.asarray(dates), len(self.nodes)),
+            **{col: values.ravel() for col, values in out.items()},
+        })
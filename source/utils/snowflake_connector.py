@@ -2,6 +2,7 @@
 
 import yaml
 import snowflake.connector 
+from source.utils.arrow_results import arrow_to_pandas
 from sqlalchemy import create_engine
 from snowflake.sqlalchemy import URL
 import os
@@ -73,6 +74,41 @@ class SnowflakeConnector:
         finally:
             cur.close()
 
+    def fetch_arrow(self, query, params=None):
+        """Execute a SQL query and return the result as a pyarrow Table, without building row tuples"""
+        cur = self.get_connection().cursor()
+        try:
+            cur.execute(query, params or {})
+            return cur.fetch_arrow_all(force_return_table=True)
+        finally:
+            cur.close()
+
+    def fetch_df(self, query, parse_dates=None, params=None):
+        """Execute a SQL query and return a DataFrame with lowercase, typed columns (via Arrow)"""
+        return arrow_to_pandas(self.fetch_arrow(query, params), parse_dates)
+
+    def fetch_batches(self, query, parse_dates=None, params=None):
+        """Yield the result as DataFrames, one per Arrow result chunk, so it never has to fit in memory at once"""
+        cur = self.get_connection().cursor()
+        try:
+            cur.execute(query, params or {})
+            for table in cur.fetch_arrow_batches():
+                yield arrow_to_pandas(table, parse_dates)
+        finally:
+            cur.close()
+
+    def get_table_version(self, table_name):
+        """Return a token that changes whenever the table is modified (its LAST_ALTERED timestamp)"""
+        rows = self.execute_query(
+            """
+            SELECT LAST_ALTERED
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = CURRENT_SCHEMA() AND TABLE_NAME = %(table_name)s
+            """,
+            {'table_name': table_name.upper()}
+        )
+        return str(rows[0][0]) if rows else None
+
     def close(self):
         """Close all connections"""
         if self._conn:
@@ -0,0 +1,152 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StagingLoadError(RuntimeError):
+    """Raised after all uploads or loads have finished if any of them failed; .report has every result."""
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+class ConcurrentStagingLoader:
+    """
+    Parallel PUTs and asynchronous COPYs on one Snowflake connection.
+
+    Works with snowflake.connector connections and with LocalSnowflakeConnection,
+    which implements the same cursor / execute_async / query status calls locally.
+    """
+
+    def __init__(self, conn, max_workers=6, poll_interval=0.5):
+        self.conn = conn
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+
+    # 🔹 Uploads
+
+    def _put(self, file_path, stage):
+        started = time.perf_counter()
+        cur = self.conn.cursor()
+        try:
+            cur.execute(f"PUT file://{file_path} @{stage} AUTO_COMPRESS=FALSE;")
+            rows = cur.fetchall()
+            # PUT result rows: source, target, sizes, compressions, status, message
+            status = rows[0][6] if rows else 'UNKNOWN'
+            error = None if status in ('UPLOADED', 'SKIPPED') else (rows[0][7] if rows else 'No result')
+        except Exception as e:
+            status, error = 'FAILED', str(e)
+        finally:
+            cur.close()
+        return {'stage': stage, 'status': status, 'error': error, 'seconds': time.perf_counter() - started}
+
+    def upload_files(self, uploads):
+        """PUT every (file_path, stage) pair concurrently. Returns {filename: result}."""
+        print(f"🚀 Uploading {len(uploads)} files to Snowflake stages concurrently...")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stage-put') as pool:
+            futures = {
+                os.path.basename(path): pool.submit(self._put, path, stage) for path, stage in uploads
+            }
+            report = {filename: future.result() for filename, future in futures.items()}
+
+        for filename, result in report.items():
+            if result['error']:
+                print(f"❌ {filename} → {result['stage']}: {result['error']}")
+            else:
+                print(f"✅ {filename} → {result['stage']} ({result['seconds']:.1f}s)")
+        self._raise_on_failures(report, "upload")
+        return report
+
+    # 🔹 Asynchronous queries
+
+    def _submit(self, sql):
+        cur = self.conn.cursor()
+        try:
+            cur.execute_async(sql)
+            # The query keeps running server-side and is tracked by its id, so the cursor can go
+            return cur.sfqid
+        finally:
+            cur.close()
+
+    def _submit_all(self, statements):
+        """
+        Submit every {key: sql} without waiting. Returns ({key: query id}, {key: error message})
+        so a statement that fails to submit is reported like one that fails while running.
+        """
+        query_ids, errors = {}, {}
+        for key, sql in statements.items():
+            try:
+                query_ids[key] = self._submit(sql)
+            except Exception as e:
+                errors[key] = str(e)
+        return query_ids, errors
+
+    def _wait(self, query_ids):
+        """Poll until every query has finished. Returns {key: error message or None}."""
+        outcome = {}
+        pending = dict(query_ids)
+        while pending:
+            for key, qid in list(pending.items()):
+                try:
+                    status = self.conn.get_query_status_throw_if_error(qid)
+                except Exception as e:
+                    outcome[key] = str(e)
+                    del pending[key]
+                    continue
+                if not self.conn.is_still_running(status):
+                    outcome[key] = None
+                    del pending[key]
+            if pending:
+                time.sleep(self.poll_interval)
+        return outcome
+
+    def _rows_loaded(self, qid):
+        cur = self.conn.cursor()
+        try:
+            cur.get_results_from_sfqid(qid)
+            # COPY result rows: file, status, rows_parsed, rows_loaded, ...
+            return sum(row[3] for row in cur.fetchall() if len(row) > 3 and row[3] is not None)
+        finally:
+            cur.close()
+
+    def load_tables(self, loads):
+        """
+        Recreate and COPY every staging table. All CREATEs are submitted together, then all
+        COPYs, so the wall time is close to the slowest single table rather than the sum.
+        loads is a list of {'table', 'create', 'copy'}. Returns {table: result}.
+        """
+        print(f"🚀 Submitting {len(loads)} staging table loads asynchronously...")
+        started = time.perf_counter()
+        report = {load['table']: {'status': 'PENDING', 'error': None, 'rows_loaded': None} for load in loads}
+
+        create_ids, create_errors = self._submit_all({load['table']: load['create'] for load in loads})
+        create_errors.update(self._wait(create_ids))
+        for table, error in create_errors.items():
+            if error:
+                report[table].update(status='FAILED', error=f"CREATE failed: {error}")
+
+        copy_ids, copy_errors = self._submit_all(
+            {load['table']: load['copy'] for load in loads if not create_errors[load['table']]}
+        )
+        copy_errors.update(self._wait(copy_ids))
+        for table, error in copy_errors.items():
+            if error:
+                report[table].update(status='FAILED', error=f"COPY failed: {error}")
+            else:
+                report[table].update(status='LOADED', rows_loaded=self._rows_loaded(copy_ids[table]))
+
+        self.conn.commit()
+        for table, result in report.items():
+            if result['error']:
+                print(f"❌ {table}: {result['error']}")
+            else:
+                print(f"✅ {table}: {result['rows_loaded']} rows loaded")
+        print(f"✅ Staging loads finished in {time.perf_counter() - started:.1f}s.")
+        self._raise_on_failures(report, "load")
+        return report
+
+    def _raise_on_failures(self, report, action):
+        failed = [key for key, result in report.items() if result['error']]
+        if failed:
+            raise StagingLoadError(f"Staging {action} failed for: {', '.join(failed)}", report)
@@ -0,0 +1,162 @@
+import time
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+class TimeSeriesDownsampler:
+    """Downsamples long time series to viewport resolution before they are sent to Plotly."""
+
+    def __init__(self, max_points=4000, webgl_threshold=2000, method='lttb'):
+        self.max_points = max_points
+        self.webgl_threshold = webgl_threshold
+        self.method = method
+
+    def lttb_indices(self, x, y, n_out):
+        """Largest-Triangle-Three-Buckets: return the row positions that best preserve the line shape."""
+        n = len(y)
+        if n_out >= n or n_out < 3:
+            return np.arange(n)
+
+        x = np.asarray(x, dtype='float64')
+        y = np.asarray(y, dtype='float64')
+        # Interior points are split into n_out - 2 buckets; first and last points are always kept
+        edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+        selected = np.empty(n_out, dtype=int)
+        selected[0] = 0
+        selected[-1] = n - 1
+
+        a = 0
+        for i in range(n_out - 2):
+            start, stop = edges[i], edges[i + 1]
+            next_start, next_stop = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+            avg_x = x[next_start:next_stop].mean()
+            avg_y = y[next_start:next_stop].mean()
+
+            bucket_x = x[start:stop]
+            bucket_y = y[start:stop]
+            area = np.abs(
+                (x[a] - avg_x) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y - y[a])
+            )
+            a = start + int(np.argmax(area))
+            selected[i + 1] = a
+
+        return selected
+
+    def minmax_indices(self, y, n_out):
+        """Min/max bucketing: keep the extremes of each bucket so spikes are never hidden."""
+        n = len(y)
+        if n_out >= n or n_out < 4:
+            return np.arange(n)
+
+        y = np.asarray(y, dtype='float64')
+        # Two points per bucket plus the two endpoints stays within n_out
+        n_buckets = (n_out - 2) // 2
+        edges = np.linspace(0, n, n_buckets + 1).astype(int)
+        keep = [0, n - 1]
+        for start, stop in zip(edges[:-1], edges[1:]):
+            if stop <= start:
+                continue
+            bucket = y[start:stop]
+            keep.append(start + int(np.argmin(bucket)))
+            keep.append(start + int(np.argmax(bucket)))
+        return np.unique(keep)
+
+    def downsample(self, df, x, y_cols, x_range=None, n_out=None):
+        """
+        Restrict df to the visible x_range and reduce it to about n_out points per series.
+        Row positions selected for any series are kept for all series so traces stay aligned.
+        """
+        n_out = n_out or self.max_points
+        data = df.sort_values(x)
+
+        if x_range is not None:
+            lo, hi = x_range
+            mask = (data[x] >= lo) & (data[x] <= hi)
+            # Keep one neighbour on each side so lines run to the viewport edge
+            positions = np.flatnonzero(mask.to_numpy())
+            if len(positions):
+                first = max(positions[0] - 1, 0)
+                last = min(positions[-1] + 1, len(data) - 1)
+                data = data.iloc[first:last + 1]
+            else:
+                data = data.iloc[0:0]
+
+        if len(data) <= n_out:
+            return data.reset_index(drop=True)
+
+        x_values = data[x]
+        if pd.api.types.is_datetime64_any_dtype(x_values):
+            x_numeric = x_values.astype('int64').to_numpy()
+        else:
+            x_numeric = x_values.to_numpy(dtype='float64')
+
+        keep = []
+        per_series = max(n_out // len(y_cols), 3)
+        for col in y_cols:
+            y_values = data[col].to_numpy(dtype='float64')
+            valid = np.flatnonzero(~np.isnan(y_values))
+            if len(valid) == 0:
+                continue
+            if self.method == 'minmax':
+                idx = self.minmax_indices(y_values[valid], per_series)
+            else:
+                idx = self.lttb_indices(x_numeric[valid], y_values[valid], per_series)
+            keep.append(valid[idx])
+
+        if not keep:
+            return data.iloc[0:0].reset_index(drop=True)
+        return data.iloc[np.unique(np.concatenate(keep))].reset_index(drop=True)
+
+    def build_line_figure(self, df, x, y_cols, title=None, labels=None, x_range=None, band=None):
+        """
+        Build a line figure from a downsampled copy of df.
+        band is an optional (lower_col, upper_col, name) drawn as a shaded area on the same rows.
+        Returns the figure and a stats dict with point counts, payload size and render time.
+        """
+        labels = labels or {}
+        started = time.perf_counter()
+
+        plot_df = self.downsample(df, x, y_cols, x_range=x_range)
+        rendered_points = len(plot_df) * len(y_cols)
+        use_webgl = rendered_points > self.webgl_threshold
+        trace_cls = go.Scattergl if use_webgl else go.Scatter
+
+        fig = go.Figure()
+        if band is not None:
+            lower_col, upper_col, band_name = band
+            fig.add_trace(trace_cls(x=plot_df[x], y=plot_df[upper_col], mode='lines',
+                                    line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(trace_cls(x=plot_df[x], y=plot_df[lower_col], mode='lines', line=dict(width=0),
+                                    fill='tonexty', fillcolor='rgba(99, 110, 250, 0.2)', name=band_name))
+        for col in y_cols:
+            fig.add_trace(trace_cls(x=plot_df[x], y=plot_df[col], mode='lines', name=col))
+
+        fig.update_layout(
+            title=title,
+            xaxis_title=labels.get(x, x),
+            yaxis_title=labels.get('value', y_cols[0] if len(y_cols) == 1 else None),
+            legend_title_text=labels.get('variable', 'Legend') if len(y_cols) > 1 else None,
+        )
+        if x_range is not None:
+            fig.update_xaxes(range=list(x_range))
+
+        render_ms = (time.perf_counter() - started) * 1000
+        # Serialized after the timer stops, so measuring the payload doesn't count as build time
+        stats = {
+            'raw_points': len(df) * len(y_cols),
+            'rendered_points': rendered_points,
+            'webgl': use_webgl,
+            'payload_bytes': len(fig.to_json()),
+            'render_ms': render_ms,
+        }
+        return fig, stats
+
+    @staticmethod
+    def format_stats(stats):
+        """One-line summary suitable for a dashboard caption."""
+        engine = "WebGL" if stats['webgl'] else "SVG"
+        return (
+            f"Rendered {stats['rendered_points']:,} of {stats['raw_points']:,} points ({engine}) · "
+            f"payload {stats['payload_bytes'] / 1024:.1f} KB · built in {stats['render_ms']:.1f} ms"
+        )
+